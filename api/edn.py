@@ -15,16 +15,76 @@ For more information on EDN, see https://github.com/edn-format/edn."""
  the terms of this license.
  You must not remove this notice, or any other, from this software."""
 
+import codecs
 import io
-from dataclasses import dataclass
+import re
+import threading
+import weakref
 
 # Types
 
 
-@dataclass(eq=True, frozen=True)
-class Keyword:
-    name: str
-    namespace: str = ""
+class Named:
+    """An EDN element that has a name and, optionally, a namespace.
+
+    Instances are immutable and interned: creating an instance with the same
+    name and namespace as an instance that's still alive returns that
+    instance. Comparing interned instances is therefore usually a pointer
+    comparison. The intern table only holds weak references, so instances that
+    nothing else refers to don't stay in memory."""
+
+    __slots__ = ("name", "namespace", "_hash", "__weakref__")
+
+    def __init_subclass__(cls):
+        cls.interned = weakref.WeakValueDictionary()
+
+    def __new__(cls, name, namespace=""):
+        key = (name, namespace)
+
+        if (x := cls.interned.get(key)) is not None:
+            return x
+
+        with intern_lock:
+            if (x := cls.interned.get(key)) is None:
+                x = object.__new__(cls)
+                object.__setattr__(x, "name", name)
+                object.__setattr__(x, "namespace", namespace)
+                object.__setattr__(x, "_hash", hash((cls.__name__, name, namespace)))
+                cls.interned[key] = x
+
+            return x
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"cannot assign to field '{name}'")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"cannot delete field '{name}'")
+
+    def __eq__(self, other):
+        return self is other or (
+            other.__class__ is self.__class__
+            and self.name == other.name
+            and self.namespace == other.namespace
+        )
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return (self.__class__, (self.name, self.namespace))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, _):
+        return self
+
+
+intern_lock = threading.Lock()
+
+
+class Keyword(Named):
+    __slots__ = ()
 
     def __repr__(self):
         if self.namespace:
@@ -33,10 +93,8 @@ class Keyword:
             return f":{self.name}"
 
 
-@dataclass(eq=True, frozen=True)
-class Symbol:
-    name: str
-    namespace: str = ""
+class Symbol(Named):
+    __slots__ = ()
 
     def __repr__(self):
         if self.namespace:
@@ -52,119 +110,177 @@ def kwmap(d):
 
 
 # Read
+#
+# The reader walks the input string by index. Every reader function takes the
+# string and the index to start reading from and returns a tuple of the value
+# it read and the index right after that value.
+
+
+WHITESPACE = re.compile(r"[\s,]*")
+NUMBER = re.compile(r"\d+")
+TOKEN = re.compile(r"[^\s,\";^()\[\]{}\\]*")
+CHARACTER = re.compile(r".[^\s,\";^()\[\]{}\\]*", re.DOTALL)
+STRING_ESCAPE = re.compile(r"\\(.)", re.DOTALL)
+
+STRING_ESCAPES = {"t": "\t", "n": "\n", "r": ""}
+
+CHARACTER_NAMES = {
+    "space": " ",
+    "tab": "\t",
+    "newline": "\n",
+    "return": "\n",
+}
+
+
+def error(error, s, i, ch):
+    raise error(s, i, ch)
+
+
+def unescape(s):
+    """Given the contents of an EDN string literal, replace every escape
+    sequence in the string with the character it stands for."""
+    # Set escaped backslashes aside first so that every remaining backslash
+    # starts an escape sequence. Stand them in with NUL characters rather than
+    # splitting on them: a list of the pieces can take many times the memory
+    # of the string itself.
+    if "\\\\" in s and "\0" in s:
+        return "\\".join(unescape(x) for x in s.split("\\\\"))
+
+    x = s.replace("\\\\", "\0")
+
+    if "\\" in x:
+        x = (
+            x.replace("\\n", "\n")
+            .replace('\\"', '"')
+            .replace("\\t", "\t")
+            .replace("\\r", "")
+        )
+
+        if "\\" in x:
+            x = STRING_ESCAPE.sub(
+                lambda match: STRING_ESCAPES.get(match[1], match[1]), x
+            )
+
+    return x.replace("\0", "\\") if "\\\\" in s else x
+
 
+def string_end(s, i):
+    """Given a string and the index that follows the opening double quote of
+    an EDN string, return the index of the closing double quote.
 
-def error(error, b, ch):
-    raise error(b.getvalue(), b.tell(), ch)
+    A double quote preceded by an odd number of backslashes is escaped."""
+    end = s.find('"', i)
 
+    while end != -1:
+        j = end
 
-def unread(b, n):
-    """Given a file object and an integer, unread that many characters from
-    the object."""
-    b.seek(b.tell() - n)
+        while j > i and s[j - 1] == "\\":
+            j -= 1
 
+        if (end - j) % 2 == 0:
+            return end
 
-def read_string(b, _):
-    """Given a file object, read a single EDN string."""
-    with io.StringIO() as s:
-        while (ch := b.read(1)) != '"':
-            if ch == "\\":
-                ch = b.read(1)
+        end = s.find('"', end + 1)
 
-                if ch == "t":
-                    ch = "\t"
-                elif ch == "n":
-                    ch = "\n"
-                elif ch == "r":
-                    ch = ""
+    error(EOFError, s, len(s), "")
 
-            s.write(ch)
 
-        return s.getvalue()
+def read_string(s, i):
+    """Given a string and an index, read a single EDN string."""
+    end = s.find('"', i)
 
+    # Fast path: no escape sequences.
+    if end != -1 and s.find("\\", i, end) == -1:
+        return s[i:end], end + 1
 
-def read_comment(b, ch):
-    error(NotImplementedError, b, ch)
+    end = string_end(s, i)
+    return unescape(s[i:end]), end + 1
 
 
-def read_meta(b, ch):
-    error(NotImplementedError, b, ch)
+def read_comment(s, i):
+    error(NotImplementedError, s, i, ";")
 
 
-def read_list(b, _):
-    """Given a file object, read a single EDN list."""
-    return read_delimited_list(b, ")")
+def read_meta(s, i):
+    error(NotImplementedError, s, i, "^")
 
 
-def read_delimited_list(b, delim):
-    """Given a file object and a delimiter character, read an EDN element
-    that ends with that character."""
+def read_list(s, i):
+    """Given a string and an index, read a single EDN list."""
+    return read_delimited_list(s, i, ")")
+
+
+def read_delimited_list(s, i, delim):
+    """Given a string, an index, and a delimiter character, read an EDN
+    element that ends with that character."""
     xs = []
+    skip_whitespace = WHITESPACE.match
 
-    while (ch := b.read(1)) != delim:
-        if is_whitespace(ch):
-            continue
+    while True:
+        i = skip_whitespace(s, i).end()
+        ch = s[i : i + 1]
 
-        xs.append(read1(b, ch))
+        if ch == delim:
+            return xs, i + 1
+        elif not ch:
+            error(EOFError, s, i, ch)
 
-    return xs
+        x, i = read_element(s, i, ch)
+        xs.append(x)
 
 
-def read_vector(b, _):
-    """Given a file object, read a single EDN vector."""
-    return read_delimited_list(b, "]")
+def read_vector(s, i):
+    """Given a string and an index, read a single EDN vector."""
+    return read_delimited_list(s, i, "]")
 
 
-def read_set(b, _):
-    """Given a file object, read a single EDN set."""
-    return set(read_delimited_list(b, "}"))
+def read_set(s, i):
+    """Given a string and an index, read a single EDN set."""
+    xs, i = read_delimited_list(s, i, "}")
+    return set(xs), i
 
 
 class UnmatchedDelimiterError(ValueError):
     pass
 
 
-def read_unmatched_delimiter(b, ch):
-    error(UnmatchedDelimiterError, b, ch)
+def read_unmatched_delimiter(s, i):
+    error(UnmatchedDelimiterError, s, i - 1, s[i - 1])
 
 
-def read_map(b, _):
-    """Given a file object, read a single EDN map."""
-    xs = read_delimited_list(b, "}")
+def read_map(s, i):
+    """Given a string and an index, read a single EDN map."""
+    xs, i = read_delimited_list(s, i, "}")
 
     if (len(xs) & 1) == 1:
         raise ValueError("Map must have an even number of elements")
 
     it = iter(xs)
-    return dict(zip(it, it))
+    return dict(zip(it, it)), i
 
 
-def read_character(b, _):
-    """Given a file object, read a single EDN character."""
-    ch = b.read(1)
-    token = read_token(b, ch)
+def read_character(s, i):
+    """Given a string and an index, read a single EDN character."""
+    if not (match := CHARACTER.match(s, i)):
+        error(EOFError, s, i, "")
+
+    token = match.group()
 
     if len(token) == 1:
-        return token
-    elif token == "space":
-        return " "
-    elif token == "tab":
-        return "\t"
-    elif token in {"newline", "return"}:
-        return "\n"
+        return token, match.end()
+    elif token in CHARACTER_NAMES:
+        return CHARACTER_NAMES[token], match.end()
     else:
-        error(NotImplementedError, b, ch)
+        error(NotImplementedError, s, i, token[0])
 
 
-def read_dispatch(b, ch):
-    """Given a file object and a character, read an EDN element prefixed by the
+def read_dispatch(s, i):
+    """Given a string and an index, read an EDN element prefixed by the
     dispatch macro."""
-    x = b.read(1)
-
-    if x == "{":
-        return read_set(b, ch)
+    if s[i : i + 1] == "{":
+        return read_set(s, i + 1)
     else:
-        error(NotImplementedError, b, ch)
+        error(NotImplementedError, s, i - 1, "#")
 
 
 # https://github.com/clojure/clojure/blob/ecd5ff59e07de649a9f9affb897d02165fe7e553/src/jvm/clojure/lang/EdnReader.java#L37-L59
@@ -183,67 +299,19 @@ MACROS = {
 }
 
 
-def read_macro(b, ch):
-    """Read an EDN element prefixed by a macro character.
-
-    A macro character is one of:
-
-    - string
-    - comment
-    - metadata
-    - list
-    - vector
-    - map
-    - character
-    - dispatch"""
-    return MACROS.get(ch, lambda _1, _2: None).__call__(b, ch)
-
-
-def is_whitespace(ch):
-    """Given a character, return true if it's an EDN whitespace character."""
-    return ch == "," or ch.isspace()
-
-
-def is_macro(ch):
-    """Given a character, return true if it's a macro character."""
-    return ch in MACROS
-
-
-def is_terminating_macro(ch):
-    """Given a character, return true if it's a terminating macro.
-
-    A terminating macro signifies the end of an EDN token."""
-    return ch != "#" and ch != "'" and is_macro(ch)
-
-
-def read_token(b, ch):
-    """Given a file object and a start character, read a single EDN token."""
-    with io.StringIO() as s:
-        s.write(ch)
-
-        while ch := b.read(1):
-            if is_whitespace(ch) or is_terminating_macro(ch):
-                unread(b, 1)
-                break
+def read_token(s, i):
+    """Given a string and an index, read a single EDN token."""
+    end = TOKEN.match(s, i).end()
+    return s[i:end], end
 
-            s.write(ch)
 
-        return s.getvalue()
+def read_number(s, i):
+    """Given a string and an index, read a single number."""
+    end = NUMBER.match(s, i).end()
+    return int(s[i:end]), end
 
 
-def read_number(b, ch):
-    """Given a file object and a start character, read a single number."""
-    with io.StringIO() as s:
-        s.write(ch)
-
-        while x := b.read(1):
-            if not x.isdigit():
-                unread(b, 1)
-                break
-
-            s.write(x)
-
-        return int(s.getvalue())
+TOKEN_CONSTANTS = {"nil": None, "true": True, "false": False}
 
 
 def interpret_token(token):
@@ -255,12 +323,8 @@ def interpret_token(token):
     - true/false
     - keyword
     - symbol"""
-    if token == "nil":
-        return None
-    elif token == "true":
-        return True
-    elif token == "false":
-        return False
+    if token in TOKEN_CONSTANTS:
+        return TOKEN_CONSTANTS[token]
     elif token.startswith(":"):
         xs = token.split("/")
 
@@ -277,24 +341,30 @@ def interpret_token(token):
             return Symbol(xs[0])
 
 
-def read1(b, ch):
-    """Given a file object and a start character, read one EDN element from the
-    file object."""
-    while is_whitespace(ch):
-        ch = b.read(1)
-
+def read_element(s, i, ch):
+    """Given a string, an index, and the character at that index, read one
+    EDN element that starts at the index."""
     if ch.isdigit():
-        return read_number(b, ch)
-    elif is_macro(ch):
-        return read_macro(b, ch)
+        return read_number(s, i)
+    elif ch in MACROS:
+        return MACROS[ch](s, i + 1)
     else:
-        return interpret_token(read_token(b, ch))
+        token, i = read_token(s, i)
+        return interpret_token(token), i
+
+
+def read1(s, i=0):
+    """Given a string and an index, skip any whitespace at the index, then
+    read one EDN element from the string.
+
+    Return a tuple of the element and the index that follows it."""
+    i = WHITESPACE.match(s, i).end()
+    return read_element(s, i, s[i : i + 1])
 
 
 def read(s):
     """Read one EDN element from a string."""
-    with io.StringIO(s) as s:
-        return read1(s, s.read(1))
+    return read1(s)[0]
 
 
 def read_line(b):
@@ -303,118 +373,403 @@ def read_line(b):
         return read(line)
 
 
-# Write
+# Lazy envelopes
+#
+# Most of the time, routing a message to its handler only requires reading
+# the :id and :tag keys of the message. An envelope indexes the top-level keys
+# of a map, reads the scalar values, and skips over the strings and
+# collections. It reads a skipped value from the string that holds the message
+# only when something accesses it.
+
+
+DELIMITERS = re.compile(r'["\\()\[\]{}]')
+
+
+def skip_string(s, i):
+    """Given a string and the index that follows the opening double quote of
+    an EDN string, return the index that follows the closing double quote."""
+    return string_end(s, i) + 1
+
+
+def skip_collection(s, i):
+    """Given a string and the index that follows the opening delimiter of an
+    EDN collection, return the index that follows the closing delimiter."""
+    depth = 1
+    search = DELIMITERS.search
+
+    while depth:
+        if not (match := search(s, i)):
+            error(EOFError, s, i, "")
 
+        ch = match.group()
+        i = match.end()
 
-def write_nil(b, _):
-    b.write("nil")
+        if ch == '"':
+            i = skip_string(s, i)
+        elif ch == "\\":
+            i += 1
+        elif ch in "([{":
+            depth += 1
+        else:
+            depth -= 1
+
+    return i
+
+
+class Unread:
+    """The index of a value an envelope hasn't read yet."""
+
+    __slots__ = ("index",)
+
+    def __init__(self, index):
+        self.index = index
+
+
+class Envelope(dict):
+    """A map whose strings and collections are only read on first access.
+
+    Reading every value in the envelope (for example, by comparing it to
+    another map or by iterating over its items) turns it into an ordinary
+    dictionary that happens to be an instance of this class."""
+
+    __slots__ = ("source",)
+
+    def __init__(self, source):
+        self.source = source
+
+    def __getitem__(self, k):
+        v = dict.__getitem__(self, k)
+
+        if v.__class__ is Unread:
+            v = read1(self.source, v.index)[0]
+            dict.__setitem__(self, k, v)
+
+        return v
+
+    def get(self, k, default=None):
+        if k in self:
+            return self[k]
+        else:
+            return default
 
+    def pop(self, k, *default):
+        if k in self:
+            v = self[k]
+            dict.__delitem__(self, k)
+            return v
+        else:
+            return dict.pop(self, k, *default)
+
+    def setdefault(self, k, default=None):
+        if k in self:
+            return self[k]
+        else:
+            return dict.setdefault(self, k, default)
+
+    def realize(self):
+        """Read every value in this envelope that hasn't been read yet."""
+        if self.source is not None:
+            for k in dict.keys(self):
+                self[k]
+
+            self.source = None
+
+        return self
+
+    # Overriding __iter__ makes {**envelope} and dict(envelope) go through
+    # __getitem__.
+    def __iter__(self):
+        return dict.__iter__(self)
+
+    def values(self):
+        return dict.values(self.realize())
 
-def write_bool(b, x):
-    b.write("true" if x else "false")
+    def items(self):
+        return dict.items(self.realize())
 
+    def popitem(self):
+        return dict.popitem(self.realize())
 
-def write_int(b, x):
-    b.write(str(x))
+    def copy(self):
+        return dict(self.realize())
 
+    def __copy__(self):
+        return self.copy()
 
-def write_str(b, x):
-    b.write('"')
+    def __reduce__(self):
+        return (dict, (self.copy(),))
 
-    with io.StringIO(x) as s:
-        while ch := s.read(1):
-            if ch == '"':
-                b.write('\\"')
-            elif ch == "\\":
-                b.write("\\\\")
-            elif ch == "\n":
-                b.write("\\n")
+    def __eq__(self, other):
+        return dict.__eq__(self.realize(), other)
+
+    def __ne__(self, other):
+        return dict.__ne__(self.realize(), other)
+
+    def __repr__(self):
+        return dict.__repr__(self.realize())
+
+    __hash__ = None
+
+
+def read_envelope(s):
+    """Read one EDN element from a string.
+
+    If the element is a map, return an envelope that only reads the strings
+    and collections in the map when they're accessed. Otherwise, return the
+    element."""
+    i = WHITESPACE.match(s).end()
+
+    if s[i : i + 1] != "{":
+        return read1(s, i)[0]
+
+    envelope = Envelope(s)
+    skip_whitespace = WHITESPACE.match
+    i += 1
+
+    while True:
+        i = skip_whitespace(s, i).end()
+        ch = s[i : i + 1]
+
+        if ch == "}":
+            return envelope
+        elif not ch:
+            error(EOFError, s, i, ch)
+
+        k, i = read_element(s, i, ch)
+        i = skip_whitespace(s, i).end()
+        ch = s[i : i + 1]
+
+        if ch == '"':
+            v = Unread(i)
+            i = skip_string(s, i + 1)
+        elif ch in "([{":
+            v = Unread(i)
+            i = skip_collection(s, i + 1)
+        elif ch == "#" and s[i + 1 : i + 2] == "{":
+            v = Unread(i)
+            i = skip_collection(s, i + 2)
+        elif ch == "}" or not ch:
+            raise ValueError("Map must have an even number of elements")
+        else:
+            v, i = read_element(s, i, ch)
+
+        dict.__setitem__(envelope, k, v)
+
+
+class Decoder:
+    """An incremental decoder for newline-delimited EDN messages.
+
+    Feed the decoder chunks of bytes as they arrive. The decoder decodes each
+    chunk into a string as soon as it arrives, carrying over a UTF-8 sequence
+    the chunk splits, and keeps the text of an incomplete message as the list
+    of strings it has decoded so far. Only the text of the chunk is scanned for
+    the end of a message.
+
+    The reader still reads a message in one go once the chunk that completes
+    the message arrives, because a reader such as `read_envelope` needs the
+    text of the whole message."""
+
+    def __init__(self, reader=read):
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.parts = []
+        self.reader = reader
+
+    def lines(self, chunk, final=False):
+        """Given a bytes-like object, return a list of the non-empty lines
+        the bytes complete and keep the rest of the text for later."""
+        text = self.decoder.decode(chunk, final)
+        parts = self.parts
+        start = 0
+        lines = []
+
+        while (end := text.find("\n", start)) != -1:
+            if parts:
+                parts.append(text[start:end])
+                line = "".join(parts)
+                parts.clear()
             else:
-                b.write(ch)
+                line = text[start:end]
 
-    b.write('"')
+            if line:
+                lines.append(line)
 
+            start = end + 1
 
-def write_keyword(b, x):
-    b.write(":")
+        if start < len(text):
+            parts.append(text[start:])
 
-    if x.namespace:
-        b.write(x.namespace + "/")
+        return lines
+
+    def feed(self, chunk):
+        """Given a bytes-like object, return a list of the messages the bytes
+        complete."""
+        # Take the lines out of the decoder before reading them, so that a
+        # line the reader fails to read doesn't stay in the decoder.
+        return [self.reader(line) for line in self.lines(chunk)]
+
+    def finish(self):
+        """Return a list of the messages left in the decoder once the stream
+        the bytes come from ends."""
+        lines = self.lines(b"", final=True)
+        rest = "".join(self.parts)
+        self.parts.clear()
+
+        if rest.strip():
+            lines.append(rest)
 
-    b.write(x.name)
+        return [self.reader(line) for line in lines]
 
 
-def write_symbol(b, x):
+def read_socket(sock, reader=read, size=io.DEFAULT_BUFFER_SIZE * 8):
+    """Given a socket, yield every newline-delimited EDN message the socket
+    receives as soon as the message is complete.
+
+    Reads each message with the given reader function (default `read`).
+
+    Stops when the peer closes the connection."""
+    decoder = Decoder(reader)
+    chunk = bytearray(size)
+
+    with memoryview(chunk) as view:
+        while n := sock.recv_into(chunk):
+            yield from decoder.feed(view[:n])
+
+    yield from decoder.finish()
+
+
+# Write
+#
+# Every writer function takes a list and a value and appends the EDN
+# representation of the value into the list as string fragments. Joining the
+# fragments yields the EDN string.
+
+
+def write_nil(xs, _):
+    xs.append("nil")
+
+
+def write_bool(xs, x):
+    xs.append("true" if x else "false")
+
+
+def write_int(xs, x):
+    xs.append(str(x))
+
+
+def escape(x):
+    """Given a string, escape the characters in the string that have a special
+    meaning in an EDN string."""
+    # Checking for the characters first is much faster than scanning the
+    # string for them via str.translate or re.sub, because most strings we
+    # write (e.g. Base64 blobs) contain none of them.
+    if "\\" in x or '"' in x or "\n" in x:
+        return x.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    else:
+        return x
+
+
+def write_str(xs, x):
+    xs.append('"')
+    xs.append(escape(x))
+    xs.append('"')
+
+
+def write_keyword(xs, x):
     if x.namespace:
-        b.write(x.namespace + "/")
+        xs.append(f":{x.namespace}/{x.name}")
+    else:
+        xs.append(":" + x.name)
+
 
-    b.write(x.name)
+def write_symbol(xs, x):
+    if x.namespace:
+        xs.append(f"{x.namespace}/{x.name}")
+    else:
+        xs.append(x.name)
 
 
-def write_list(b, xs):
-    b.write("[")
+def write_list(xs, coll):
+    xs.append("[")
 
-    if xs:
-        for x in xs[:-1]:
-            write1(b, x)
-            b.write(", ")
+    for i, x in enumerate(coll):
+        if i:
+            xs.append(", ")
 
-        write1(b, xs[-1])
+        write1(xs, x)
 
-    b.write("]")
+    xs.append("]")
 
 
-def write_set(b, xs):
-    b.write("#{")
+def write_set(xs, coll):
+    xs.append("#{")
 
-    for x in xs:
-        write1(b, x)
-        b.write(",")
+    for x in coll:
+        write1(xs, x)
+        xs.append(",")
 
-    b.write("}")
+    xs.append("}")
 
 
-def write_dict(b, d):
-    b.write("{")
+def write_dict(xs, d):
+    xs.append("{")
 
-    if xs := list(d.items()):
-        for k, v in xs[:-1]:
-            write1(b, k)
-            b.write(" ")
-            write1(b, v)
-            b.write(" ")
+    for i, (k, v) in enumerate(d.items()):
+        if i:
+            xs.append(" ")
 
-        write1(b, xs[-1][0])
-        b.write(" ")
-        write1(b, xs[-1][1])
+        write1(xs, k)
+        xs.append(" ")
+        write1(xs, v)
 
-    b.write("}")
+    xs.append("}")
 
 
-def write1(b, x):
-    if x is None:
-        write_nil(b, x)
+WRITERS = {
+    type(None): write_nil,
+    bool: write_bool,
+    int: write_int,
+    str: write_str,
+    Keyword: write_keyword,
+    Symbol: write_symbol,
+    set: write_set,
+    list: write_list,
+    dict: write_dict,
+}
+
+
+def write1(xs, x):
+    if writer := WRITERS.get(type(x)):
+        writer(xs, x)
+    # Subclasses of the types above
     elif isinstance(x, bool):
-        write_bool(b, x)
+        write_bool(xs, x)
     elif isinstance(x, int):
-        write_int(b, x)
+        write_int(xs, x)
     elif isinstance(x, str):
-        write_str(b, x)
-    elif isinstance(x, Keyword):
-        write_keyword(b, x)
-    elif isinstance(x, Symbol):
-        write_symbol(b, x)
+        write_str(xs, x)
     elif isinstance(x, set):
-        write_set(b, x)
+        write_set(xs, x)
     elif isinstance(x, list):
-        write_list(b, x)
+        write_list(xs, x)
     elif isinstance(x, dict):
-        write_dict(b, x)
+        write_dict(xs, x)
     else:
         raise ValueError(f"""Can't write {x} as EDN""")
 
 
+def write(x):
+    """Given a value, return the EDN representation of the value as a
+    string."""
+    xs = []
+    write1(xs, x)
+    return "".join(xs)
+
+
 def write_line(b, x):
-    write1(b, x)
-    b.write("\n")
+    """Given a file object and a value, write the EDN representation of the
+    value followed by a newline into the file object in a single write."""
+    xs = []
+    write1(xs, x)
+    xs.append("\n")
+    b.write("".join(xs))
     b.flush()
@@ -0,0 +1,249 @@
+"""Benchmarks for the EDN module.
+
+Generates corpora of messages that have the same shape as the messages
+Tutkain exchanges with Clojure runtimes, then measures how fast the EDN
+module reads and writes them and how much memory it allocates doing so.
+
+The benchmarks don't depend on Sublime Text. To run them, in the root
+directory of this package, run:
+
+    python -m api.edn_benchmark
+
+For options, run:
+
+    python -m api.edn_benchmark --help"""
+
+import argparse
+import base64
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+from . import edn
+
+K = edn.Keyword
+S = edn.Symbol
+
+
+# Corpora
+
+
+def completions(n):
+    """Return a :completions response with n candidates."""
+    return {
+        K("id"): 42,
+        K("completions"): [
+            {
+                K("trigger"): f"clojure.core/some-function-{i}",
+                K("type"): K("function"),
+                K("arglists"): ["[f]", "[f coll]", "[f c1 c2 & colls]"],
+                K("doc"): "Returns a lazy sequence consisting of the result of "
+                "applying f to\n  the set of first items of each coll, followed "
+                'by applying f to the "set"\n  of second items in each coll.',
+                K("ns"): "clojure.core",
+            }
+            for i in range(n)
+        ],
+    }
+
+
+def test_results(n):
+    """Return a :test response with n passing assertions."""
+    var_meta = {
+        K("name"): S("test-some-function"),
+        K("ns"): "my.app-test",
+        K("file"): "/home/user/src/my-app/test/my/app_test.clj",
+        K("line"): 12,
+        K("column"): 1,
+    }
+
+    return {
+        K("id"): 43,
+        K("tag"): K("ret"),
+        K("val"): f"{{:test 1, :pass {n}, :fail 0, :error 0, :type :summary}}\n",
+        K("fail"): [],
+        K("error"): [],
+        K("pass"): [
+            {K("type"): K("pass"), K("line"): 13 + i, K("var-meta"): var_meta}
+            for i in range(n)
+        ],
+    }
+
+
+def lookup(n):
+    """Return a :lookup response with n arglists."""
+    return {
+        K("id"): 44,
+        K("info"): {
+            K("name"): S("map"),
+            K("ns"): "clojure.core",
+            K("file"): "jar:file:/home/user/.m2/repository/org/clojure/clojure/1.12.0/"
+            "clojure-1.12.0.jar!/clojure/core.clj",
+            K("line"): 2776,
+            K("column"): 1,
+            K("arglists"): [f"[f c{i} & colls]" for i in range(n)],
+            K("doc"): "Returns a lazy sequence consisting of the result of applying "
+            "f to\n  the set of first items of each coll, followed by applying f "
+            "to the\n  set of second items in each coll, until any one of the colls "
+            "is\n  exhausted.  Any remaining items in other colls are ignored.",
+            K("fnspec"): {K("args"): "nil", K("ret"): "nil", K("fn"): "nil"},
+        },
+    }
+
+
+def out(n):
+    """Return an :out message whose value is n lines of log output."""
+    return {
+        K("tag"): K("out"),
+        K("val"): "2024-01-01 12:00:00.000 INFO [my.app.worker] "
+        'Processed job {:id 1234, :status :ok, :name "job"}\n' * n,
+    }
+
+
+def pretty_printed_ret(n):
+    """Return a :ret message whose value is a pretty-printed map with n
+    entries."""
+    return {
+        K("id"): 45,
+        K("tag"): K("ret"),
+        K("val"): "{"
+        + "\n ".join(
+            f':key-{i} {{:name "value {i}", :tags #{{:a :b}}}}' for i in range(n)
+        )
+        + "}\n",
+    }
+
+
+def load(n):
+    """Return a :load op whose code is an n-byte Base64 blob."""
+    return {
+        K("op"): K("load"),
+        K("code"): base64.b64encode(os.urandom(n * 3 // 4)).decode("ascii"),
+        K("file"): "/home/user/src/my-app/src/my/app.clj",
+        K("id"): 46,
+    }
+
+
+CORPORA = {
+    "completions": lambda scale: completions(2000 * scale),
+    "test": lambda scale: test_results(2000 * scale),
+    "lookup": lambda scale: lookup(4 * scale),
+    "out": lambda scale: out(5 * scale),
+    "ret": lambda scale: pretty_printed_ret(5000 * scale),
+    "load": lambda scale: load(1_000_000 * scale),
+}
+
+
+# Measurement
+
+
+def ops_per_second(f, duration):
+    """Given a function and a duration in seconds, call the function
+    repeatedly for (at least) that long and return the number of calls per
+    second."""
+    n = 0
+    start = time.perf_counter()
+
+    while (elapsed := time.perf_counter() - start) < duration:
+        f()
+        n += 1
+
+    return n / elapsed
+
+
+def allocations(f):
+    """Given a function, call it once and return a tuple of the number of
+    memory blocks its return value holds on to and the peak number of bytes
+    allocated during the call."""
+    tracemalloc.start()
+
+    try:
+        blocks = sys.getallocatedblocks()
+        ret = f()
+        retained = sys.getallocatedblocks() - blocks
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    del ret
+    return retained, peak
+
+
+def write(x):
+    b = io.StringIO()
+    edn.write_line(b, x)
+    return b.getvalue()
+
+
+def route(s):
+    """Read a message as an envelope and get its :id, like the client does
+    when routing a response."""
+    envelope = edn.read_envelope(s)
+    envelope.get(K("id"))
+    return envelope
+
+
+def benchmarks(message):
+    s = write(message)
+
+    return s, {
+        "read": lambda: edn.read(s),
+        "read_envelope": lambda: route(s),
+        "write_line": lambda: write(message),
+    }
+
+
+def run(corpora, scale, duration):
+    print(
+        f"{'corpus':<12} {'size':>10} {'operation':<14} {'ops/s':>10} {'MB/s':>9} "
+        f"{'blocks':>9} {'peak KiB':>10}"
+    )
+
+    for name in corpora:
+        s, fs = benchmarks(CORPORA[name](scale))
+        size = len(s.encode("utf-8"))
+
+        for operation, f in fs.items():
+            rate = ops_per_second(f, duration)
+            blocks, peak = allocations(f)
+
+            print(
+                f"{name:<12} {size:>10} {operation:<14} {rate:>10.1f} "
+                f"{rate * size / 1e6:>9.2f} {blocks:>9} {peak / 1024:>10.1f}"
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m api.edn_benchmark", description="Benchmark the EDN module."
+    )
+    parser.add_argument(
+        "corpora",
+        nargs="*",
+        metavar="corpus",
+        help=f"the corpora to benchmark: {', '.join(CORPORA)} (default: all)",
+    )
+    parser.add_argument(
+        "--scale",
+        type=int,
+        default=1,
+        help="multiply the size of every message by this number (default: 1)",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=1.0,
+        help="seconds to spend on each benchmark (default: 1.0)",
+    )
+    args = parser.parse_args(argv)
+
+    if unknown := set(args.corpora) - CORPORA.keys():
+        parser.error(f"unknown corpora: {', '.join(sorted(unknown))}")
+
+    run(args.corpora or CORPORA.keys(), args.scale, args.duration)
+
+
+if __name__ == "__main__":
+    main()
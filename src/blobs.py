@@ -0,0 +1,104 @@
+"""A cache of the Base64-encoded contents of the Clojure source files Tutkain
+sends to Clojure runtimes.
+
+Keeps blobs in memory and on disk, under the Sublime Text cache directory,
+keyed by the path, modification time, and size of the source file, so that
+connecting to a runtime needn't read, hash, compress, and encode every
+source file every time."""
+
+import collections
+import hashlib
+import os
+import threading
+import zlib
+
+import sublime
+
+from . import base64
+from .log import log
+
+CACHE_DIR = os.path.join(sublime.cache_path(), "Tutkain", "blobs")
+
+Blob = collections.namedtuple("Blob", ["digest", "data", "deflated"])
+Blob.__doc__ = """A Base64-encoded source file.
+
+`digest` is the SHA-256 hash of the contents of the file. If `deflated` is
+true, `data` is compressed with zlib before encoding."""
+
+lock = threading.Lock()
+blobs = {}
+
+
+def cache_path(cache_dir, path, deflate):
+    name = hashlib.sha1(path.encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, name + (".z64" if deflate else ".b64"))
+
+
+def read_cache(cache_file, version):
+    """Given the path to a cache file and the version of the source file it
+    caches, return the blob in the cache file, or None if the cache file
+    doesn't exist or caches another version of the source file."""
+    try:
+        with open(cache_file, "r", encoding="ascii") as file:
+            header = file.readline().split()
+
+            if len(header) == 4 and header[:2] == [str(n) for n in version]:
+                return Blob(header[2], file.read(), header[3] == "z")
+    except (OSError, ValueError):
+        pass
+
+
+def write_cache(cache_file, version, blob):
+    temp_file = f"{cache_file}.{os.getpid()}.{threading.get_ident()}"
+
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+
+        with open(temp_file, "w", encoding="ascii") as file:
+            file.write(
+                f"{version[0]} {version[1]} {blob.digest} {'z' if blob.deflated else 'b'}\n"
+            )
+            file.write(blob.data)
+
+        os.replace(temp_file, cache_file)
+    except OSError as error:
+        log.error("blobs/write-error", path=cache_file, error=error)
+
+
+def encode(path, deflate):
+    with open(path, "rb") as file:
+        source = file.read()
+
+    digest = hashlib.sha256(source).hexdigest()
+
+    if deflate:
+        source = zlib.compress(source, 9)
+
+    return Blob(digest, base64.encode(source), deflate)
+
+
+def load(path, deflate=False, cache_dir=CACHE_DIR):
+    """Given the path to a source file, return a Blob of the contents of the
+    file.
+
+    If `deflate` is true, compress the contents of the file before encoding
+    them."""
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    key = (cache_dir, path, deflate)
+
+    with lock:
+        if (entry := blobs.get(key)) and entry[0] == version:
+            return entry[1]
+
+    cache_file = cache_path(cache_dir, path, deflate)
+
+    if not (blob := read_cache(cache_file, version)):
+        blob = encode(path, deflate)
+        write_cache(cache_file, version, blob)
+        log.debug("blobs/miss", path=path, deflate=deflate)
+
+    with lock:
+        blobs[key] = (version, blob)
+
+    return blob
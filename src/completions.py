@@ -104,12 +104,17 @@ def enclosing_sexp_sans_prefix(view, expr, prefix):
     return view.substr(before) + view.substr(after)
 
 
+# The number of seconds to wait for completions before giving up on them.
+COMPLETIONS_TIMEOUT = 5
+
+
 def handler(completion_list, response, flags):
     tag = response.get(edn.Keyword("tag"))
 
     if tag is not None and tag == edn.Keyword("err"):
         ex = response.get(edn.Keyword("val"))
-        log.debug({"event": "error", "exception": ex})
+        log.debug("error", exception=ex)
+        completion_list.set_completions([], flags=flags)
     else:
         completions = response.get(edn.Keyword("completions"), [])
         completion_list.set_completions(map(completion_item, completions), flags=flags)
@@ -180,7 +185,9 @@ def get_completions(view, prefix, point):
                 flags = sublime.AutoCompleteFlags.NONE
 
             client.send_op(
-                op, handler=lambda response: handler(completion_list, response, flags)
+                op,
+                handler=lambda response: handler(completion_list, response, flags),
+                timeout=COMPLETIONS_TIMEOUT,
             )
 
             return completion_list
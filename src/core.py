@@ -1,3 +1,4 @@
+import datetime
 import json
 import os
 import textwrap
@@ -34,8 +35,8 @@ from . import (
     temp,
     test,
 )
-from .log import start_logging, stop_logging
-from .repl import history, info, ports, query
+from .log import log, start_logging, stop_logging
+from .repl import history, info, lookups, ports, query, spool
 
 import Default.history_list as history_list
 
@@ -83,7 +84,10 @@ def make_color_scheme(cache_dir):
 
 
 def plugin_loaded():
-    start_logging(settings.load().get("debug", False))
+    start_logging(
+        settings.load().get("debug", False),
+        settings.load().get("log_buffer_size", 1000),
+    )
     preferences = sublime.load_settings("Preferences.sublime-settings")
     cache_dir = os.path.join(sublime.cache_path(), "Tutkain")
     make_color_scheme(cache_dir)
@@ -386,6 +390,47 @@ def get_eval_region(view, region, scope="outermost", ignore={}):
     return without_discard_macro(view, eval_region)
 
 
+class TutkainTrimOutputViewImplCommand(TextCommand):
+    def is_visible(self):
+        return False
+
+    def run(self, edit, size=0):
+        self.view.erase(edit, sublime.Region(0, size))
+
+
+class TutkainOpenOutputHistoryCommand(WindowCommand):
+    """Open the full transcript of the active REPL view, including the output
+    Tutkain has trimmed from the view."""
+
+    def run(self):
+        view = state.get_active_output_view(self.window)
+
+        if (transcript := spool.find(view)) and os.path.isfile(transcript.path):
+            view = self.window.open_file(transcript.path)
+            view.set_read_only(True)
+        else:
+            self.window.status_message("⚠ No output history for this REPL view.")
+
+
+class TutkainDumpLogCommand(WindowCommand):
+    """Write the recent log events Tutkain keeps in memory into a JSON Lines
+    file and open the file."""
+
+    def run(self):
+        directory = os.path.join(sublime.cache_path(), "Tutkain", "log")
+        timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(directory, f"{timestamp}.jsonl")
+
+        try:
+            os.makedirs(directory, exist_ok=True)
+            n = log.dump(path)
+        except OSError as error:
+            self.window.status_message(f"⚠ Could not write log: {error}")
+        else:
+            self.window.status_message(f"Wrote {n} log events into {path}.")
+            self.window.open_file(path)
+
+
 class TutkainReplaceRegionImplCommand(TextCommand):
     def is_visible(self):
         return False
@@ -570,6 +615,7 @@ class TutkainEvaluateCommand(ConnectedTextCommand):
                                 "op": edn.Keyword("load"),
                                 "code": base64.encode(code.encode("utf-8")),
                                 "file": self.view.file_name(),
+                                "ns": namespace.name(self.view),
                             },
                             handler,
                         )
@@ -582,9 +628,14 @@ class TutkainEvaluateCommand(ConnectedTextCommand):
                         sublime.set_clipboard(val)
                         client.print(item)
 
-                        sublime.active_window().status_message(
-                            "[Tutkain] Evaluation result copied to clipboard."
-                        )
+                        if edn.Keyword("next-offset") in item:
+                            sublime.active_window().status_message(
+                                "[Tutkain] Evaluation result truncated; copied the first page to clipboard."
+                            )
+                        else:
+                            sublime.active_window().status_message(
+                                "[Tutkain] Evaluation result copied to clipboard."
+                            )
 
                     def evaluator(region, code, options, sel=None):
                         self.eval(
@@ -956,9 +1007,6 @@ class TutkainConnectCommand(WindowCommand):
                     init,
                     mode,
                 )
-            except ConnectionRefusedError:
-                output_view.close()
-                self.window.status_message(f"⚠ Connection to {host}:{port} refused.")
             finally:
                 self.window.focus_view(active_view)
         else:
@@ -1022,15 +1070,27 @@ def lookup(view, form, handler):
         and (dialect := dialects.for_point(view, form.begin()))
         and (client := state.get_client(view.window(), dialect))
     ):
-        client.send_op(
-            {
-                "op": edn.Keyword("lookup"),
-                "ident": view.substr(form),
-                "ns": namespace.name(view),
-                "dialect": dialect,
-            },
-            handler,
-        )
+        ident = view.substr(form)
+        ns = namespace.name(view)
+        key = lookups.key(client, dialect, ns, ident)
+
+        if (response := lookups.cache.get(key)) is not None:
+            handler(response)
+        else:
+
+            def cache_and_handle(response):
+                lookups.cache.put(key, response)
+                handler(response)
+
+            client.send_op(
+                {
+                    "op": edn.Keyword("lookup"),
+                    "ident": ident,
+                    "ns": ns,
+                    "dialect": dialect,
+                },
+                cache_and_handle,
+            )
 
 
 class TutkainShowInformationCommand(ConnectedTextCommand):
@@ -1193,6 +1253,7 @@ class TutkainEventListener(EventListener):
 
     def on_close(self, view):
         if view.settings().get("tutkain_repl_view_dialect"):
+            spool.close(view)
             window = sublime.active_window()
             num_groups = window.num_groups()
 
@@ -1403,6 +1464,71 @@ class TutkainInterruptEvaluationCommand(ConnectedWindowCommand):
             client.send_op({"op": edn.Keyword("interrupt")})
 
 
+class TutkainShowMoreOfResultCommand(ConnectedWindowCommand):
+    """Print the next page of the last evaluation result that was too large
+    to print in full."""
+
+    def run(self):
+        dialect = dialects.for_view(self.window.active_view()) or edn.Keyword("clj")
+
+        if (client := state.get_client(self.window, dialect)) is None:
+            self.window.status_message(
+                f"⚠ Not connected to a {dialects.name(dialect)} REPL."
+            )
+        elif not client.fetch_result():
+            self.window.status_message("⚠ No more evaluation result to show.")
+
+
+class TutkainShowConnectionStatsCommand(ConnectedWindowCommand):
+    """Show the round-trip latencies, handling times, and response sizes of
+    the ops of every connection in a new view."""
+
+    def run(self):
+        reports = [
+            connection.client.connection_stats()
+            for connection in state.get_connections().values()
+        ]
+
+        view = self.window.new_file()
+        view.set_name("Tutkain: Connection Stats")
+        view.set_scratch(True)
+        view.run_command("append", {"characters": "\n".join(reports)})
+        view.set_read_only(True)
+
+
+class ResultPathInputHandler(TextInputHandler):
+    def name(self):
+        return "path"
+
+    def placeholder(self):
+        return "Path (an EDN vector of keys and indices, e.g. [:users 0 :name])"
+
+    def validate(self, text):
+        try:
+            return isinstance(edn.read(text), list)
+        except Exception:
+            return False
+
+
+class TutkainShowPartOfResultCommand(ConnectedWindowCommand):
+    """Print the part of the last evaluation result that was too large to
+    print in full at the given path."""
+
+    def input(self, args):
+        if "path" not in args:
+            return ResultPathInputHandler()
+
+    def run(self, path):
+        dialect = dialects.for_view(self.window.active_view()) or edn.Keyword("clj")
+
+        if (client := state.get_client(self.window, dialect)) is None:
+            self.window.status_message(
+                f"⚠ Not connected to a {dialects.name(dialect)} REPL."
+            )
+        elif not client.fetch_result(path=edn.read(path)):
+            self.window.status_message("⚠ No evaluation result to show.")
+
+
 class TutkainInsertNewlineCommand(TextCommand):
     def run(self, edit, extend_comment=True):
         indent.insert_newline_and_indent(self.view, edit, extend_comment)
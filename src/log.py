@@ -1,9 +1,196 @@
+"""Structured event logging.
+
+Call sites log an event name and the fields of the event:
+
+    log.debug("client/send", item=item)
+
+If neither the console nor the event buffer wants events of the given level,
+logging an event does nothing else. Otherwise, the fields are truncated (see
+`truncate`) and the event goes into an in-memory ring buffer of recent events
+and, if the level is enabled for the console, into the Sublime Text console.
+
+Formatting an event for the console only happens when the console handler
+emits it. The ring buffer holds truncated events, so it never keeps large
+messages alive. Tutkain: Dump Log writes the buffer into a JSON Lines file."""
+
+import collections
+import datetime
+import json
 import logging
+import threading
+import time
+
+from ..api import edn
+
+logger = logging.getLogger(__package__)
+
+# Truncate strings in the fields of an event to this many characters.
+MAX_STRING_LENGTH = 512
+
+# Truncate collections in the fields of an event to this many items.
+MAX_ITEMS = 32
+
+# Replace collections nested deeper than this in the fields of an event with
+# a placeholder.
+MAX_DEPTH = 4
+
+# The number of events the ring buffer holds.
+BUFFER_SIZE = 1000
+
+
+def truncate_string(s):
+    if len(s) <= MAX_STRING_LENGTH:
+        return s
+
+    return f"{s[:MAX_STRING_LENGTH]}… ({len(s) - MAX_STRING_LENGTH} more characters)"
+
+
+def truncate(value, depth=0):
+    """Given a value, return a copy of the value that's cheap to keep and
+    that json.dumps can serialize.
+
+    Truncates long strings and large collections, converts map keys into
+    strings, and replaces nested collections beyond MAX_DEPTH with a
+    placeholder. Doesn't read the unread values of an edn.Envelope: instead,
+    truncates the EDN source of the envelope."""
+    if isinstance(value, str):
+        return truncate_string(value)
+    elif value is None or isinstance(value, (bool, int, float)):
+        return value
+    elif isinstance(value, edn.Envelope) and value.source is not None:
+        return truncate_string(value.source)
+    elif isinstance(value, BaseException):
+        return repr(value)
+    elif isinstance(value, (dict, list, tuple, set)):
+        if depth >= MAX_DEPTH:
+            return f"<{type(value).__name__} of {len(value)} items>"
+
+        if isinstance(value, dict):
+            items = dict.items(value)
+            truncated = {
+                str(k): truncate(v, depth + 1)
+                for _, (k, v) in zip(range(MAX_ITEMS), items)
+            }
+        else:
+            truncated = [
+                truncate(v, depth + 1) for _, v in zip(range(MAX_ITEMS), value)
+            ]
+
+        if len(value) > MAX_ITEMS:
+            more = f"… ({len(value) - MAX_ITEMS} more items)"
+
+            if isinstance(truncated, dict):
+                truncated["…"] = more
+            else:
+                truncated.append(more)
+
+        return truncated
+    else:
+        return truncate_string(str(value))
+
+
+class Event:
+    """A logged event. Formats itself as JSON when a log handler asks for its
+    string representation."""
+
+    __slots__ = ("time", "level", "thread", "name", "fields")
+
+    def __init__(self, level, name, fields):
+        self.time = time.time()
+        self.level = level
+        self.thread = threading.current_thread().name
+        self.name = name
+        self.fields = {k: truncate(v) for k, v in fields.items()}
+
+    def to_dict(self):
+        return {
+            "time": datetime.datetime.fromtimestamp(self.time).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": logging.getLevelName(self.level),
+            "thread": self.thread,
+            "event": self.name,
+            **self.fields,
+        }
+
+    def __str__(self):
+        return json.dumps(
+            {"event": self.name, **self.fields}, ensure_ascii=False, default=str
+        )
+
+
+class Log:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buffer = collections.deque(maxlen=BUFFER_SIZE)
+        self.buffer_level = logging.INFO
+        self.level = logging.INFO
+
+    def configure(self, console_level, buffer_size, buffer_level=logging.INFO):
+        """Given the minimum level of the events to print into the console,
+        the number of recent events to keep in the ring buffer (0 disables the
+        buffer), and the minimum level of the events to keep in the buffer,
+        configure this log."""
+        with self.lock:
+            self.buffer = collections.deque(self.buffer, maxlen=buffer_size)
+            self.buffer_level = buffer_level if buffer_size else logging.CRITICAL + 1
+
+        logger.setLevel(console_level)
+        self.level = min(console_level, self.buffer_level)
+
+    def enabled(self, level):
+        """Return True if logging an event of the given level does anything."""
+        return level >= self.level
+
+    def log(self, level, name, fields):
+        event = Event(level, name, fields)
+
+        if level >= self.buffer_level:
+            with self.lock:
+                self.buffer.append(event)
+
+        if logger.isEnabledFor(level):
+            logger.log(level, "%s", event)
+
+    def debug(self, name, **fields):
+        if logging.DEBUG >= self.level:
+            self.log(logging.DEBUG, name, fields)
+
+    def info(self, name, **fields):
+        if logging.INFO >= self.level:
+            self.log(logging.INFO, name, fields)
+
+    def warning(self, name, **fields):
+        if logging.WARNING >= self.level:
+            self.log(logging.WARNING, name, fields)
+
+    def error(self, name, **fields):
+        if logging.ERROR >= self.level:
+            self.log(logging.ERROR, name, fields)
+
+    def events(self):
+        """Return a list of the events in the ring buffer, oldest first."""
+        with self.lock:
+            return list(self.buffer)
+
+    def dump(self, path):
+        """Given a path, write the events in the ring buffer into the file at
+        the path, one JSON object per line. Return the number of events
+        written."""
+        events = self.events()
+
+        with open(path, "w", encoding="utf-8") as file:
+            for event in events:
+                file.write(json.dumps(event.to_dict(), ensure_ascii=False, default=str))
+                file.write("\n")
+
+        return len(events)
+
 
-log = logging.getLogger(__package__)
+log = Log()
 
 
-def start_logging(debug=False):
+def start_logging(debug=False, buffer_size=BUFFER_SIZE):
     handler = logging.StreamHandler()
 
     formatter = logging.Formatter(
@@ -12,10 +199,13 @@ def start_logging(debug=False):
     )
 
     handler.setFormatter(formatter)
-    log.addHandler(handler)
+    logger.addHandler(handler)
 
-    log.setLevel(logging.DEBUG if debug else logging.INFO)
+    # Keep debug events only when debugging, so that the events on hot paths
+    # such as sending and receiving messages cost nothing otherwise.
+    level = logging.DEBUG if debug else logging.INFO
+    log.configure(level, buffer_size, level)
 
 
 def stop_logging():
-    log.handlers = []
+    logger.handlers = []
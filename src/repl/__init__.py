@@ -1,35 +1,129 @@
+import codecs
 import datetime
 import io
 import os
 import pathlib
 import posixpath
-import queue
 import socket
+import time
+import traceback
 import types
 import uuid
 from abc import abstractmethod
 from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from inspect import cleandoc
 from threading import Thread
 
 import sublime
 
 from ...api import edn
-from .. import base64, dialects, progress, settings, state, status
+from .. import blobs, dialects, progress, settings, state, status
 from ..log import log
-from . import backchannel, formatter, printer, views, edn_client
-
-
-def read_until_prompt(socket: socket.SocketType):
+from . import (
+    backchannel,
+    formatter,
+    heartbeat,
+    lookups,
+    metrics,
+    printer,
+    views,
+    edn_client,
+)
+from .reactor import reactor
+
+
+PROMPT = b"=> "
+
+# Connects clients to Clojure runtimes off the UI thread, several at a time.
+connector = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tutkain.connect")
+
+STAGES = {
+    "connect": "Connecting",
+    "greeting": "Waiting for REPL",
+    "bootstrap": "Bootstrapping",
+    "backchannel": "Connecting to backchannel",
+    "modules": "Loading modules",
+}
+
+
+def read_until_prompt(sock: socket.SocketType):
     """Given a socket, read bytes from the socket until `=> `, then return the
-    read bytes."""
+    read bytes.
+
+    Peeks at whatever the socket has received so far and only consumes the
+    bytes up to and including the prompt, leaving the bytes that follow the
+    prompt in the socket for whoever reads from it next."""
     bs = bytearray()
 
-    while bs[-3:] != bytearray(b"=> "):
-        bs.extend(socket.recv(1))
+    while True:
+        chunk = sock.recv(io.DEFAULT_BUFFER_SIZE, socket.MSG_PEEK)
+
+        if not chunk:
+            raise ConnectionError(
+                "Connection closed before the server sent a REPL prompt."
+            )
+
+        # The prompt might straddle the previous chunk and this one.
+        start = max(0, len(bs) - len(PROMPT) + 1)
+        bs.extend(chunk)
+
+        if (index := bs.find(PROMPT, start)) != -1:
+            end = index + len(PROMPT)
+            consume(sock, len(chunk) - (len(bs) - end))
+            del bs[end:]
+            return bs
+
+        consume(sock, len(chunk))
+
+
+def consume(sock: socket.SocketType, n):
+    """Given a socket and an integer, read and discard that many bytes from
+    the socket."""
+    while n > 0:
+        n -= len(sock.recv(n))
+
 
-    return bs
+class LineReader:
+    """Reads lines from a blocking socket during the handshake.
 
+    Keeps the bytes it receives after the last line it returns, so that they
+    can go to whoever reads from the socket next."""
+
+    def __init__(self, sock: socket.SocketType):
+        self.sock = sock
+        self.buffer = bytearray()
+
+    def readline(self):
+        """Return the next line the socket receives, including the newline,
+        or what's left of the line if the socket closes first."""
+        buffer = self.buffer
+        scanned = 0
+
+        while (end := buffer.find(b"\n", scanned)) == -1:
+            scanned = len(buffer)
+
+            if not (chunk := self.sock.recv(io.DEFAULT_BUFFER_SIZE)):
+                end = len(buffer) - 1
+                break
+
+            buffer += chunk
+
+        line = buffer[: end + 1].decode("utf-8")
+        del buffer[: end + 1]
+        return line
+
+    def drain(self):
+        """Return the bytes this reader has received but not returned yet and
+        forget them."""
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+
+# The Clojure source files every client loads before starting a REPL or an RPC
+# server, in load order.
+BOOTSTRAP_FILES = ["pprint.cljc", "format.cljc", "base64.cljc", "rpc.cljc"]
 
 BASE64_BLOB = """(intern (create-ns 'tutkain.repl) 'load-base64 #?(:bb (fn [blob _ _] (load-string (String. (.decode (java.util.Base64/getDecoder) blob) "UTF-8"))) :clj (fn [blob file filename] (with-open [reader (-> (java.util.Base64/getDecoder) (.decode blob) (java.io.ByteArrayInputStream.) (java.io.InputStreamReader.) (clojure.lang.LineNumberingPushbackReader.))] (clojure.lang.Compiler/load reader file filename)))))"""
 
@@ -47,8 +141,17 @@ class Client(edn_client.Client):
     connection_err_msg = "NOTE: Tutkain requires Clojure 1.10.0 or newer.\n"
 
     def start_workers(self):
-        self.executor.submit(self.send_loop)
-        self.executor.submit(self.recv_loop)
+        """Hand the socket of this client over to the I/O reactor, which sends
+        everything this client has queued so far and starts reading what the
+        Clojure runtime sends back.
+
+        Hands the bytes the handshake has received but not read over to the
+        reactor first, so that this client handles them before anything the
+        reactor reads from the socket."""
+        if data := self.reader.drain():
+            reactor.call_soon(lambda: self.recv(data))
+
+        self.connection.start()
         return self
 
     def write_line(self, line):
@@ -61,22 +164,124 @@ class Client(edn_client.Client):
         if response.get(edn.Keyword("tag")) == edn.Keyword("ret"):
             self.capabilities.add(response.get(edn.Keyword("val")))
 
-    def load_modules(self):
+        self.pending_modules -= 1
+
+        if self.pending_modules == 0:
+            self.timings["modules"] = time.perf_counter() - self.modules_started
+            log.debug("client/timings", timings=self.timings)
+            self.on_stage("ready")
+
+    def send_modules(self, response, sources):
+        """Given the response to a :loaded-modules op and a dict of module
+        filenames to their paths and blobs, send every
+        module the Clojure runtime doesn't already have to the runtime.
+
+        If the runtime fails to tell which modules it has, send every module."""
+        if response.get(edn.Keyword("tag")) == edn.Keyword("err"):
+            log.warning("client/loaded-modules-error", response=response)
+            loaded = set()
+        else:
+            loaded = set(response.get(edn.Keyword("val")) or ())
+
+        log.debug("client/loaded-modules", modules=loaded)
+
         for filename, requires in self.modules.items():
-            path = os.path.join(settings.source_root(), filename)
+            path, blob = sources[filename]
 
-            with open(path, "rb") as file:
+            if filename in loaded:
+                self.module_loaded(
+                    edn.kwmap({"tag": edn.Keyword("ret"), "val": filename})
+                )
+            else:
                 self.send_op(
                     {
                         "op": edn.Keyword("load-base64"),
                         "path": path,
                         "filename": filename,
-                        "blob": base64.encode(file.read()),
+                        "blob": blob.data,
+                        "deflated?": blob.deflated,
                         "requires": requires,
+                        "hash": blob.digest,
                     },
                     self.module_loaded,
                 )
 
+    def load_modules(self):
+        """Load the modules of this client into the Clojure runtime.
+
+        Sends the content hashes of the modules first, then only the modules
+        the runtime hasn't loaded yet, or whose contents have changed since
+        the runtime loaded them."""
+        sources = {}
+
+        for filename in self.modules:
+            path = os.path.join(settings.source_root(), filename)
+            sources[filename] = (path, blobs.load(path, deflate=True))
+
+        self.on_stage("modules")
+        self.pending_modules = len(self.modules)
+        self.modules_started = time.perf_counter()
+
+        self.send_op(
+            {
+                "op": edn.Keyword("loaded-modules"),
+                "modules": {
+                    filename: blob.digest for filename, (_, blob) in sources.items()
+                },
+            },
+            lambda response: self.send_modules(response, sources),
+        )
+
+    @contextmanager
+    def timed(self, stage):
+        """Record the time it takes to execute the body of this context manager
+        as the duration of the given connection stage."""
+        self.on_stage(stage)
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.timings[stage] = time.perf_counter() - start
+
+    def read_ack(self):
+        """Read the response the runtime prints after evaluating a form we
+        send it during the handshake."""
+        while (line := self.reader.readline()) == "\n":
+            pass
+
+        if not line:
+            raise ConnectionError("Connection closed during handshake.")
+
+        return line
+
+    def bootstrap(self, filenames, command):
+        """Given a list of Clojure source files belonging to this package and a
+        line of Clojure code, load the files into the runtime, then send the
+        code for evaluation.
+
+        Writes every file back-to-back instead of waiting for the runtime to
+        acknowledge each file before sending the next one, then reads the
+        acknowledgements in order. Returns the response to the code."""
+        self.buffer.write(BASE64_BLOB + "\n")
+
+        for filename in filenames:
+            path = self.source_path(filename)
+            blob = blobs.load(path).data
+
+            self.buffer.write(
+                f"""(tutkain.repl/load-base64 "{blob}" "{path}" "{os.path.basename(path)}")\n"""
+            )
+
+        self.buffer.write(command + "\n")
+        self.buffer.flush()
+
+        for filename in ["load-base64", *filenames]:
+            ack = self.read_ack()
+            log.debug("client/bootstrap", filename=filename, ack=ack)
+
+        return self.read_ack()
+
     @abstractmethod
     def handshake(self):
         pass
@@ -90,17 +295,28 @@ class Client(edn_client.Client):
         return greeting
 
     def connect(self):
-        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.socket.connect((self.host, self.port))
-        self.buffer = self.socket.makefile(mode="rw")
-        log.debug({"event": "client/connect", "host": self.host, "port": self.port})
+        with self.timed("connect"):
+            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.socket.connect((self.host, self.port))
+            self.buffer = self.socket.makefile(mode="w")
+            self.reader = LineReader(self.socket)
+            self.connection = reactor.connection(
+                self.socket, f"{self.name}.{self.id}", self.recv, self.disconnected
+            )
 
-        log.debug(
-            {
-                "event": "client/handshake",
-                "data": self.executor.submit(self.read_greeting).result(timeout=5),
-            }
-        )
+        log.debug("client/connect", host=self.host, port=self.port)
+
+        with self.timed("greeting"):
+            self.socket.settimeout(5)
+
+            try:
+                greeting = self.read_greeting()
+            except socket.timeout as error:
+                raise TimeoutError from error
+            finally:
+                self.socket.settimeout(None)
+
+        log.debug("client/handshake", data=greeting)
 
         return self
 
@@ -124,34 +340,44 @@ class Client(edn_client.Client):
         self.port = port
         self.name = name
         self.dialect = dialect
-        self.sendq = queue.Queue()
-        self.printq = queue.Queue()
-        self.executor = ThreadPoolExecutor(thread_name_prefix=f"{self.name}.{self.id}")
+        self.printq = printer.PrintQueue()
+        self.connection = None
+        self.decoder = (
+            edn.Decoder(self.read)
+            if mode == "rpc"
+            else codecs.getincrementaldecoder("utf-8")()
+        )
         self.backchannel = types.SimpleNamespace(
             send=lambda *args, **kwargs: None, halt=lambda *args: None
         )
         self.mode = mode
         self.options = options
         self.capabilities = set()
+        self.timings = {}
+        self.pending_modules = 0
+        self.modules_started = 0
         self.ready = False
         self.on_close = lambda: None
-
-    def send(self, message):
-        if isinstance(message, dict):
-            edn.write_line(self.buffer, message)
+        self.on_stage = lambda stage: None
+        # Called with the error that makes finishing the connection fail after
+        # connect has returned.
+        self.on_error = lambda error: log.error("client/connect-error", error=error)
+        # The last response with a page of a result the Clojure runtime kept
+        # in its result store.
+        self.result = None
+        self.heartbeat = None
+
+    def send(self, item):
+        """Given a dict or a string, queue the item for sending to the Clojure
+        runtime this client is connected to.
+
+        Sends a dict as an EDN message and a string as is."""
+        log.debug("client/send", item=item)
+
+        if isinstance(item, dict):
+            self.write_message(item)
         else:
-            self.write_line(message)
-
-    def send_loop(self):
-        """Start a loop that reads strings from `self.sendq` and sends them to
-        the Clojure runtime this client is connected to for evaluation."""
-        while item := self.sendq.get():
-            log.debug({"event": "client/send", "item": item})
-            self.send(item)
-
-        self.write_line("{:op :quit}")
-        self.socket.shutdown(socket.SHUT_RDWR)
-        log.debug({"event": "thread/exit"})
+            self.connection.write((item + "\n").encode("utf-8"))
 
     def evaluate_repl(
         self, code, options={"file": "NO_SOURCE_FILE", "line": 0, "column": 0}
@@ -164,13 +390,24 @@ class Client(edn_client.Client):
                   associated with (default `"NO_SOURCE_FILE"`)
         - `line`: the line number the code is positioned at (default `0`)
         - `column`: the column number the code is positioned at (default `0`)"""
+        lookups.cache.invalidate(self.id, options.get("ns"))
+
         if self.has_backchannel():
             self.backchannel.send(
                 {"op": edn.Keyword("set-thread-bindings"), **options},
-                lambda _: self.sendq.put(code),
+                lambda response: self.send_with_bindings(response, code),
             )
         else:
-            self.sendq.put(code)
+            self.send(code)
+
+    def send_with_bindings(self, response, code):
+        """Given the response to a :set-thread-bindings op and a string of
+        Clojure code, send the code for evaluation, unless setting the thread
+        bindings failed."""
+        if response.get(edn.Keyword("tag")) == edn.Keyword("err"):
+            self.print(response)
+        else:
+            self.send(code)
 
     def evaluate_rpc(
         self,
@@ -193,67 +430,147 @@ class Client(edn_client.Client):
             **options,
         }
 
+        lookups.cache.invalidate(self.id, options.get("ns"))
+
         if self.mode == "repl" and self.has_backchannel():
             self.backchannel.send(message, handler)
         else:
             message = self.register_handler(message, handler)
-            self.sendq.put(message)
+            self.send(message)
 
     def print(self, item):
+        if isinstance(item, dict) and edn.Keyword("handle") in item:
+            self.result = item
+
         self.printq.put(formatter.format(item))
 
-    def recv(self):
+        if isinstance(item, dict) and edn.Keyword("next-offset") in item:
+            self.printq.put(
+                formatter.format(
+                    edn.kwmap(
+                        {
+                            "tag": edn.Keyword("out"),
+                            "val": "[Tutkain] Result truncated. To see more, run Tutkain: Show More of Result.\n",
+                        }
+                    )
+                )
+            )
+
+    def fetch_result(self, path=[], offset=None, handler=None):
+        """Fetch a page of the last evaluation result the Clojure runtime kept
+        in its result store instead of sending it in full.
+
+        Given a path relative to the path of the last page, fetch the first
+        page of the value at that path. Given no path, fetch the page of the
+        last value that starts at `offset`, or the next page of the last value
+        if `offset` is None.
+
+        Return False if there's no result to fetch, True otherwise."""
+        if not (result := self.result):
+            return False
+
+        if path:
+            offset = 0
+        elif offset is None:
+            if (offset := result.get(edn.Keyword("next-offset"))) is None:
+                return False
+
+        self.send_op(
+            {
+                "op": edn.Keyword("result"),
+                "handle": result.get(edn.Keyword("handle")),
+                "path": result.get(edn.Keyword("path"), []) + path,
+                "offset": offset,
+            },
+            handler,
+        )
+
+        return True
+
+    def recv(self, data):
+        """Given a chunk of bytes this client has received from the Clojure
+        runtime, call the handler function on every item the chunk completes.
+
+        In RPC mode, an item is an EDN message. In REPL mode, an item is a
+        string."""
         if self.mode == "rpc":
-            return edn.read_line(self.buffer)
+            items = self.decoder.feed(data)
+        elif item := self.decoder.decode(data):
+            items = [item]
         else:
-            return self.socket.recv(io.DEFAULT_BUFFER_SIZE).decode("utf-8")
+            items = []
+
+        for item in items:
+            log.debug("client/recv", item=item)
+            self.handle(item)
+
+    def ops_client(self):
+        """Return the client this client sends ops through: the backchannel in
+        REPL mode, this client in RPC mode."""
+        return self.backchannel if self.mode == "repl" else self
+
+    def connection_stats(self):
+        """Return a plain text report of the round-trip latencies, handling
+        times, and response sizes of the ops this client has sent."""
+        client = self.ops_client()
+
+        if not isinstance(client, edn_client.Client):
+            return f"{self.host}:{self.port}\n\n  No backchannel.\n"
+
+        return metrics.render(
+            f"{dialects.name(self.dialect)} · {self.host}:{self.port} · {self.mode.upper()} mode",
+            client.stats(),
+            client.metrics.snapshot(),
+        )
+
+    def start_heartbeat(self, interval, on_change):
+        """Given an interval in seconds and a function to call with the
+        heartbeat of this client whenever its description changes, start
+        sending :echo ops to the Clojure runtime at the interval.
+
+        Does nothing if the interval is 0 or this client has no backchannel to
+        send ops through."""
+        if interval and isinstance(self.ops_client(), edn_client.Client):
+            self.heartbeat = heartbeat.Heartbeat(self, interval, on_change).start()
+
+    def send_op(self, message, handler=None, timeout=None):
+        if message.get("op") in {edn.Keyword("load"), edn.Keyword("test")}:
+            lookups.cache.invalidate(self.id, message.get("ns"))
 
-    def send_op(self, message, handler=None):
         if self.mode == "repl" and self.has_backchannel():
-            self.backchannel.send(message, handler)
+            self.backchannel.send(message, handler, timeout)
         else:
-            message = self.register_handler(message, handler)
-            self.sendq.put(message)
+            if message := self.register_handler(message, handler, timeout):
+                self.send(message)
 
-    def recv_loop(self):
-        """Start a loop that reads evaluation responses from a socket and calls the handler function on them."""
-        try:
-            while item := self.recv():
-                log.debug({"event": "client/recv", "item": item})
-                self.handle(item)
-        except OSError as error:
-            log.error({"event": "error", "error": error})
-        finally:
-            self.print(
-                edn.kwmap(
-                    {
-                        "tag": edn.Keyword("err"),
-                        "val": f"[Tutkain] Disconnected from {dialects.name(self.dialect)} runtime at {self.host}:{self.port}.\n",
-                    }
-                )
-            )
+    def disconnected(self):
+        """Called on the reactor thread once the connection to the Clojure
+        runtime has closed."""
+        self.heartbeat and self.heartbeat.stop()
+        lookups.cache.invalidate(self.id)
+        message = f"[Tutkain] Disconnected from {dialects.name(self.dialect)} runtime at {self.host}:{self.port}.\n"
+        self.fail(message)
+        self.print(edn.kwmap({"tag": edn.Keyword("err"), "val": message}))
 
-            # Put a None into the queue to tell consumers to stop reading it.
-            self.print(None)
+        # Put a None into the queue to tell consumers to stop reading it.
+        self.print(None)
 
-            log.debug({"event": "thread/exit"})
-
-            try:
-                self.on_close()
-                self.buffer.close()
-                self.socket.close()
-                log.debug({"event": "client/disconnect"})
-            except OSError as error:
-                log.debug({"event": "error", "exception": error})
+        try:
+            self.on_close()
+            self.buffer.close()
+            log.debug("client/disconnect")
+        except OSError as error:
+            log.debug("error", exception=error)
 
     def halt(self):
         """Halt this client."""
-        log.debug({"event": "client/halt"})
+        log.debug("client/halt")
+        self.heartbeat and self.heartbeat.stop()
         self.backchannel.halt()
 
-        # Feed poison pill to input queue.
-        self.sendq.put(None)
-        self.executor.shutdown(wait=False)
+        if self.connection:
+            self.send("{:op :quit}")
+            self.connection.close()
 
 
 class JVMClient(Client):
@@ -282,26 +599,6 @@ class JVMClient(Client):
         self.write_line(
             """(clojure.main/repl :init (constantly nil) :prompt (constantly "") :need-prompt (constantly false))"""
         )
-        self.write_line(BASE64_BLOB)
-        self.buffer.readline()
-
-        for filename in [
-            "pprint.cljc",
-            "format.cljc",
-            "base64.cljc",
-            "rpc.cljc",
-            "repl.cljc",
-        ]:
-            path = self.source_path(filename)
-
-            with open(path, "rb") as file:
-                blob = base64.encode(file.read())
-                self.write_line(
-                    f"""(tutkain.repl/load-base64 "{blob}" "{path}" "{os.path.basename(path)}")"""
-                )
-
-            self.buffer.readline()
-
         init = self.options.get("init") or "tutkain.rpc/default-init"
         add_tap = self.options.get("add_tap", False)
 
@@ -309,10 +606,12 @@ class JVMClient(Client):
             backchannel_opts = self.options.get("backchannel", {})
             backchannel_port = backchannel_opts.get("port", 0)
             backchannel_bind_address = backchannel_opts.get("bind_address", "localhost")
-            self.write_line(
-                f"""(tutkain.repl/repl {{:init `{init} :add-tap? {"true" if add_tap else "false"} :port {backchannel_port} :bind-address "{backchannel_bind_address}"}})"""
-            )
-            line = self.buffer.readline()
+
+            with self.timed("bootstrap"):
+                line = self.bootstrap(
+                    BOOTSTRAP_FILES + ["repl.cljc"],
+                    f"""(tutkain.repl/repl {{:init `{init} :add-tap? {"true" if add_tap else "false"} :port {backchannel_port} :bind-address "{backchannel_bind_address}"}})""",
+                )
 
             ret = edn.read(line)
 
@@ -321,17 +620,19 @@ class JVMClient(Client):
             elif (host := ret.get(edn.Keyword("host"))) and (
                 port := ret.get(edn.Keyword("port"))
             ):
-                self.backchannel = backchannel.Client(self.print).connect(
-                    self.id, host, port
-                )
+                with self.timed("backchannel"):
+                    self.backchannel = backchannel.Client(self.print).connect(
+                        self.id, host, port
+                    )
             else:
                 self.print(ret)
         else:
-            self.write_line(
-                f"""(tutkain.rpc/rpc {{:init `{init} :add-tap? {"true" if add_tap else "false"}}})"""
-            )
+            with self.timed("bootstrap"):
+                line = self.bootstrap(
+                    BOOTSTRAP_FILES + ["repl.cljc"],
+                    f"""(tutkain.rpc/rpc {{:init `{init} :add-tap? {"true" if add_tap else "false"}}})""",
+                )
 
-            line = self.buffer.readline()
             ret = edn.read(line)
             self.print(ret)
 
@@ -393,15 +694,19 @@ class JSClient(Client):
             '(clojure.main/repl :init (constantly nil) :prompt (constantly "") :need-prompt (constantly false))'
         )
         self.write_line("""(sort (shadow.cljs.devtools.api/get-build-ids))""")
-        build_id_options = edn.read_line(self.buffer)
+        build_id_options = edn.read_line(self.reader)
 
         if build_id := self.options.get("build_id"):
             self.handshake(build_id)
         else:
-            self.executor.submit(
-                self.options.get("prompt_for_build_id"),
-                build_id_options,
-                lambda index: self.handshake(build_id_options[index]),
+            sublime.set_timeout(
+                lambda: self.options.get("prompt_for_build_id")(
+                    build_id_options,
+                    lambda index: connector.submit(
+                        self.finish_handshake, build_id_options[index]
+                    ),
+                ),
+                0,
             )
 
         return self
@@ -411,28 +716,20 @@ class JSClient(Client):
     ):
         self.evaluate_rpc(code, options)
 
-    def handshake(self, build_id):
-        self.write_line(BASE64_BLOB)
-        self.buffer.readline()
-
-        for filename in [
-            "pprint.cljc",
-            "format.cljc",
-            "base64.cljc",
-            "rpc.cljc",
-            "shadow.clj",
-        ]:
-            path = self.source_path(filename)
-
-            with open(path, "rb") as file:
-                blob = base64.encode(file.read())
-                self.write_line(
-                    f"""(tutkain.repl/load-base64 "{blob}" "{path}" "{os.path.basename(path)}")"""
-                )
-
-            self.buffer.readline()
+    def finish_handshake(self, build_id):
+        """Given a build ID, finish the handshake on the connector thread,
+        where nothing waits on the result, so hand any error to on_error."""
+        try:
+            self.handshake(build_id)
+        except Exception as error:
+            self.on_error(error)
 
-        self.write_line(f"""(tutkain.shadow/rpc {{:build-id {build_id}}})""")
+    def handshake(self, build_id):
+        with self.timed("bootstrap"):
+            self.bootstrap(
+                BOOTSTRAP_FILES + ["shadow.clj"],
+                f"""(tutkain.shadow/rpc {{:build-id {build_id}}})""",
+            )
 
         self.load_modules()
         self.start_workers()
@@ -484,43 +781,74 @@ def set_layout(window):
         window.set_layout(layout)
 
 
-def start(view, client):
-    window = view.window() or sublime.active_window()
-    active_view = window.active_view()
-    views.create_tap_panel(view)
-
-    try:
-        client.connect()
-        state.register_connection(view, window, client)
-
-        if view.element() is None:
-            set_layout(window)
-
-        views.configure(
-            view,
-            client.dialect,
-            client.id,
-            client.host,
-            client.port,
-            settings.load().get("repl_view_settings", {}),
+def report_stage(client, stage):
+    """Given a client and the name of the connection stage the client is in,
+    show the stage in the status bar."""
+    if stage == "ready" or stage not in STAGES:
+        progress.stop()
+    else:
+        progress.start(
+            f"{dialects.name(client.dialect)} · {client.host}:{client.port} · {STAGES[stage]}..."
         )
 
-        if not client.has_backchannel() and len(state.get_connections()) == 1:
-            view.assign_syntax("Plain Text.tmLanguage")
 
-        client.ready = True
+def connected(view, window, active_view, client):
+    state.register_connection(view, window, client)
 
-        if view.element() is None:
-            window.focus_view(view)
-        else:
-            views.show_output_panel(window)
-            state.on_activated(window, active_view)
+    if view.element() is None:
+        set_layout(window)
 
-        status.set_connection_status(active_view, client)
+    views.configure(
+        view,
+        client.dialect,
+        client.id,
+        client.host,
+        client.port,
+        settings.load().get("repl_view_settings", {}),
+    )
 
-        return client
-    except TimeoutError:
-        view.close()
+    if not client.has_backchannel() and len(state.get_connections()) == 1:
+        view.assign_syntax("Plain Text.tmLanguage")
+
+    client.ready = True
+    client.start_heartbeat(
+        settings.load().get("heartbeat_interval", 5),
+        lambda _: sublime.set_timeout(lambda: refresh_connection_status(client)),
+    )
+
+    if view.element() is None:
+        window.focus_view(view)
+    else:
+        views.show_output_panel(window)
+        state.on_activated(window, active_view)
+
+    status.set_connection_status(active_view, client)
+    active_view and window.focus_view(active_view)
+
+
+def refresh_connection_status(client):
+    """Update the connection status of every window's active view that uses
+    the given client."""
+    for window in sublime.windows():
+        view = window.active_view()
+
+        if (dialect := dialects.for_view(view)) and state.get_client(
+            window, dialect
+        ) is client:
+            status.set_connection_status(view, client)
+
+
+def connect_failed(view, window, client, error):
+    """Given the view, the window, and the client of a connection, and the
+    error that made connecting the client fail, tear the connection down and
+    tell the user why.
+
+    Call from the except block that caught the error."""
+    progress.stop()
+    client.print(None)
+    view.close()
+
+    if isinstance(error, TimeoutError):
         sublime.error_message(
             cleandoc(
                 """
@@ -532,6 +860,53 @@ def start(view, client):
             """
             )
         )
+    elif isinstance(error, OSError):
+        log.error("client/connect-error", error=error)
+
+        if isinstance(error, ConnectionRefusedError):
+            window.status_message(
+                f"⚠ Connection to {client.host}:{client.port} refused."
+            )
+        else:
+            window.status_message(
+                f"⚠ Couldn't connect to {client.host}:{client.port}: {error}"
+            )
+    else:
+        client.connection and client.connection.close()
+        log.error("client/connect-error", error=error, traceback=traceback.format_exc())
+        window.status_message(
+            f"⚠ Couldn't connect to {client.host}:{client.port}: {error}"
+        )
+
+
+def connect(view, window, active_view, client):
+    try:
+        client.connect()
+
+        if not client.pending_modules:
+            progress.stop()
+
+        connected(view, window, active_view, client)
+        return client
+    except Exception as error:
+        # connect runs on the connector thread and nothing waits on its Future,
+        # so report every error here instead of leaving it in the Future.
+        connect_failed(view, window, client, error)
+
+
+def start(view, client):
+    """Given a view and a client, connect the client to its Clojure runtime
+    and register the connection once the client is ready.
+
+    Connects in the background and shows the connection stage in the status
+    bar. Returns a Future that resolves to the client, or None if connecting
+    fails."""
+    window = view.window() or sublime.active_window()
+    active_view = window.active_view()
+    views.create_tap_panel(view)
+    client.on_stage = lambda stage: report_stage(client, stage)
+    client.on_error = lambda error: connect_failed(view, window, client, error)
+    return connector.submit(connect, view, window, active_view, client)
 
 
 def start_printer(client, view, options={}):
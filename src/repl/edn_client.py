@@ -1,26 +1,290 @@
 from abc import ABC
+import hashlib
 import itertools
 from threading import Lock
+import time
 
 from ...api import edn
 from ..log import log
+from . import metrics
+from .reactor import reactor
+
+# The number of seconds to wait for the response to an op before giving up on
+# it.
+DEFAULT_TIMEOUT = 30
+
+# Ops that can legitimately run for an arbitrarily long time, and therefore
+# never time out.
+#
+# Includes the ops clients send while connecting, because a cold JVM can take
+# longer than DEFAULT_TIMEOUT to answer them, and :set-thread-bindings, which
+# waits for every op the runtime handles in order before it.
+LONG_RUNNING_OPS = {
+    edn.Keyword("eval"),
+    edn.Keyword("load"),
+    edn.Keyword("load-base64"),
+    edn.Keyword("loaded-modules"),
+    edn.Keyword("set-thread-bindings"),
+    edn.Keyword("test"),
+    edn.Keyword("sync-deps"),
+    edn.Keyword("add-lib"),
+    edn.Keyword("add-libs"),
+}
+
+# Read-only ops whose identical requests share one response while a request
+# is in flight.
+COALESCIBLE_OPS = {
+    edn.Keyword("completions"),
+    edn.Keyword("locals"),
+    edn.Keyword("lookup"),
+}
+
+# Ops a user is waiting on as they type or move the caret. Clients send these
+# ahead of other ops.
+INTERACTIVE_OPS = {
+    edn.Keyword("completions"),
+    edn.Keyword("echo"),
+    edn.Keyword("interrupt"),
+    edn.Keyword("locals"),
+    edn.Keyword("lookup"),
+}
+
+# Messages larger than this many characters go out in :chunk messages of at
+# most this many characters, so that interactive ops can go out in between.
+CHUNK_SIZE = 65536
+
+# The number of IDs of expired requests to remember, so that late responses
+# to those requests don't end up in the default handler.
+MAX_EXPIRED_IDS = 1000
+
+
+def request_key(message):
+    """Given a message, return a hash of the message sans its ID that's the
+    same for every message with the same keys and values."""
+    items = sorted(
+        (edn.write(k), edn.write(v))
+        for k, v in message.items()
+        if k != edn.Keyword("id")
+    )
+
+    return hashlib.blake2b(repr(items).encode("utf-8"), digest_size=16).digest()
+
+
+def frames(message):
+    """Given a message, return a list of the frames (bytes objects) to send
+    the message in.
+
+    Splits a message with an ID that's larger than CHUNK_SIZE characters into
+    :chunk messages. The server reassembles the message from the :data of its
+    chunks once the chunk with :last? true arrives."""
+    data = edn.write(message)
+    id = message.get(edn.Keyword("id"))
+
+    if id is None or len(data) <= CHUNK_SIZE:
+        return [(data + "\n").encode("utf-8")]
+
+    chunks = [data[i : i + CHUNK_SIZE] for i in range(0, len(data), CHUNK_SIZE)]
+
+    return [
+        (
+            edn.write(
+                edn.kwmap(
+                    {
+                        "op": edn.Keyword("chunk"),
+                        "id": id,
+                        "data": chunk,
+                        "last?": i == len(chunks) - 1,
+                    }
+                )
+            )
+            + "\n"
+        ).encode("utf-8")
+        for i, chunk in enumerate(chunks)
+    ]
 
 
 class Client(ABC):
     def __init__(self, default_handler):
         self.handlers = {}
+        self.followers = {}
+        self.inflight = {}
+        self.inflight_keys = {}
+        self.deadlines = {}
+        self.sent = {}
+        self.metrics = metrics.Metrics()
+        self.expired_ids = {}
+        self.expired = 0
         self.message_id = itertools.count(1)
         self.default_handler = default_handler
         self.lock = Lock()
 
-    def register_handler(self, message, handler):
+    def register_handler(self, message, handler, timeout=None):
+        """Given a message, a handler function, and, optionally, a timeout in
+        seconds, assign an ID to the message and register the handler to be
+        called on the response to the message. Return the message.
+
+        If no response arrives within the timeout, call the handler with a
+        timeout response instead. Without a timeout, use DEFAULT_TIMEOUT,
+        unless the op of the message is one of LONG_RUNNING_OPS.
+
+        If the op of the message is one of COALESCIBLE_OPS and an identical
+        message is already awaiting a response, register the handler to be
+        called on the response to that message instead and return None. The
+        caller must then not send the message."""
         message = edn.kwmap(message)
-        message_id = next(self.message_id)
-        message[edn.Keyword("id")] = message_id
+        op = message.get(edn.Keyword("op"))
+        key = handler and op in COALESCIBLE_OPS and request_key(message)
+
+        if not handler:
+            message[edn.Keyword("id")] = next(self.message_id)
+            return message
+
+        if timeout is None and op not in LONG_RUNNING_OPS:
+            timeout = DEFAULT_TIMEOUT
+
+        # Look up and register an identical message in flight atomically, so
+        # that two threads can't both send the same coalescible message.
+        with self.lock:
+            if key and (message_id := self.inflight.get(key)) is not None:
+                self.followers.setdefault(message_id, []).append(handler)
+                log.debug("client/coalesce", id=message_id)
+                return None
+
+            message_id = next(self.message_id)
+            message[edn.Keyword("id")] = message_id
+            self.handlers[message_id] = handler
+            self.sent[message_id] = (op, time.monotonic())
+            self.metrics.record_inflight(len(self.handlers))
+
+            if key:
+                self.inflight[key] = message_id
+                self.inflight_keys[message_id] = key
+
+            if timeout is not None:
+                self.deadlines[message_id] = reactor.call_later(
+                    timeout, lambda: self.expire(message)
+                )
+
+        return message
+
+    def write_message(self, message):
+        """Given a message, write the message into the connection of this
+        client, ahead of other messages if its op is one of
+        INTERACTIVE_OPS."""
+        urgent = message.get(edn.Keyword("op")) in INTERACTIVE_OPS
+
+        for frame in frames(message):
+            self.connection.write(frame, urgent)
+
+    def expire(self, message):
+        """Given a message whose response hasn't arrived in time, release the
+        handler of the message and call it with a timeout response."""
+        message_id = message.get(edn.Keyword("id"))
+        op = message.get(edn.Keyword("op"))
+
+        with self.lock:
+            self.deadlines.pop(message_id, None)
+            handlers = self.release(message_id)
+
+            if not handlers:
+                return
+
+            self.metrics.record_timeout(op)
+            self.expired += 1
+            self.forget(message_id)
+
+        log.warning("client/timeout", id=message_id, op=op)
 
-        if handler:
+        self.fail_handlers(
+            handlers,
+            message_id,
+            f"[Tutkain] Timed out waiting for a response to {edn.write(op)}.\n",
+        )
+
+    def fail(self, reason):
+        """Given a reason (a string), release the handlers of every request
+        awaiting a response and call them with an error response that gives the
+        reason. Drop the responses to those requests if they arrive later."""
+        with self.lock:
+            failed = []
+
+            for message_id in list(self.handlers):
+                if deadline := self.deadlines.pop(message_id, None):
+                    deadline.cancel()
+
+                failed.append((message_id, self.release(message_id)))
+                self.forget(message_id)
+
+        if failed:
+            log.warning("client/fail", ids=[message_id for message_id, _ in failed])
+
+        for message_id, handlers in failed:
+            self.fail_handlers(handlers, message_id, reason)
+
+    def forget(self, message_id):
+        """Given a message ID, drop the response to the message once it
+        arrives.
+
+        Call with self.lock held."""
+        self.expired_ids[message_id] = True
+
+        if len(self.expired_ids) > MAX_EXPIRED_IDS:
+            del self.expired_ids[next(iter(self.expired_ids))]
+
+    def fail_handlers(self, handlers, message_id, reason):
+        response = edn.kwmap(
+            {
+                "id": message_id,
+                "tag": edn.Keyword("err"),
+                "val": reason,
+                "timeout": True,
+            }
+        )
+
+        for handler in handlers:
+            self.call_handler(handler, response)
+
+    def release(self, message_id):
+        """Given a message ID, stop waiting for a response to the message.
+        Return the list of handlers that were waiting for the response.
+
+        Call with self.lock held."""
+        handlers = []
+
+        if (handler := self.handlers.pop(message_id, None)) is not None:
+            handlers.append(handler)
+
+        self.sent.pop(message_id, None)
+
+        handlers.extend(self.followers.pop(message_id, ()))
+
+        if (key := self.inflight_keys.pop(message_id, None)) is not None:
+            del self.inflight[key]
+
+        return handlers
+
+    def stats(self):
+        """Return the number of requests awaiting a response, the peak number
+        of requests that have awaited a response at once, and the number of
+        requests that have timed out."""
+        with self.lock:
+            return {
+                "outstanding": len(self.handlers),
+                "peak": self.metrics.peak_inflight,
+                "expired": self.expired,
+            }
+
+    def read(self, line):
+        """Given a line that contains a message this client has received, read
+        the message and record its size."""
+        message = edn.read_envelope(line)
+
+        if isinstance(message, dict):
             with self.lock:
-                self.handlers[message_id] = handler
+                sent = self.sent.get(message.get(edn.Keyword("id")))
+
+            if sent:
+                self.metrics.record_size(sent[0], len(line))
 
         return message
 
@@ -29,22 +293,44 @@ class Client(ABC):
         message in this backchannel instance.
 
         If there's no handler function for the message, call the default
-        handler function instead."""
-        try:
-            if isinstance(message, str):
-                self.default_handler(message)
-            elif isinstance(message, dict):
+        handler function instead.
+
+        Log the error a handler function raises instead of raising it, so that
+        a failing handler doesn't take the connection down with it."""
+        if isinstance(message, str):
+            self.call_handler(self.default_handler, message)
+        elif isinstance(message, dict):
+            try:
                 id = message.get(edn.Keyword("id"))
+            except AttributeError:
+                raise ValueError(f"Got invalid message: {message}")
 
-                try:
-                    with self.lock:
-                        handler = self.handlers.get(id, self.default_handler)
-
-                    handler.__call__(message)
-                except AttributeError as error:
-                    log.error({"event": "error", "message": message, "error": error})
-                finally:
-                    with self.lock:
-                        self.handlers.pop(id, None)
-        except AttributeError:
-            raise ValueError(f"Got invalid message: {message}")
+            with self.lock:
+                if id in self.expired_ids:
+                    log.debug("client/late-response", id=id)
+                    return
+
+                if deadline := self.deadlines.pop(id, None):
+                    deadline.cancel()
+
+                sent = self.sent.get(id)
+                handlers = self.release(id) or [self.default_handler]
+
+            if sent:
+                op, start = sent
+                received = time.monotonic()
+                self.metrics.record_latency(op, received - start)
+
+            for handler in handlers:
+                self.call_handler(handler, message)
+
+            if sent:
+                self.metrics.record_handling(op, time.monotonic() - received)
+
+    def call_handler(self, handler, message):
+        """Given a handler function and a message, call the handler with the
+        message and log any error the handler raises."""
+        try:
+            handler.__call__(message)
+        except Exception as error:
+            log.error("client/handler-error", message=message, error=error)
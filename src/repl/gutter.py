@@ -0,0 +1,44 @@
+from array import array
+from bisect import bisect_left
+
+import sublime
+
+
+class Marks:
+    """The points of the gutter marks of one tag in one view.
+
+    Keeps the points in an array, oldest first. Retains at most `maxlen`
+    points. Dropping the points that fall off the head of the array happens
+    in batches, so adding a point costs amortized O(1)."""
+
+    def __init__(self, maxlen=1000):
+        self.maxlen = maxlen
+        self.points = array("q")
+
+    def __len__(self):
+        return min(len(self.points), self.maxlen)
+
+    def __bool__(self):
+        return bool(self.points)
+
+    def extend(self, points):
+        """Given an iterable of points, add a mark at every point."""
+        self.points.extend(points)
+
+        if len(self.points) >= self.maxlen * 2:
+            del self.points[: len(self.points) - self.maxlen]
+
+    def shift(self, n):
+        """Given the number of characters removed from the start of the view,
+        drop the marks that pointed into the removed characters and move the
+        rest of the marks back by that many characters."""
+        if n > 0:
+            index = bisect_left(self.points, n)
+            self.points = array("q", (point - n for point in self.points[index:]))
+
+    def clear(self):
+        del self.points[:]
+
+    def regions(self):
+        """Return a list of sublime.Region for the retained marks."""
+        return [sublime.Region(point, point) for point in self.points[-self.maxlen :]]
@@ -0,0 +1,120 @@
+"""Periodic :echo ops that measure the round-trip time to a runtime and tell
+whether the runtime is still responding.
+
+The runtime answers :echo on the thread that reads its messages, so a
+runtime that's busy evaluating something still answers. A runtime that
+misses DEGRADED_AFTER beats in a row is degraded; a runtime that misses
+DEAD_AFTER beats in a row is dead, and every request awaiting a response
+from it fails immediately, including evaluations and other requests that
+have no deadline."""
+
+import time
+
+from ...api import edn
+from ..log import log
+from .reactor import reactor
+
+# The number of consecutive missed beats after which a connection is
+# degraded.
+DEGRADED_AFTER = 1
+
+# The number of consecutive missed beats after which a connection is dead.
+DEAD_AFTER = 3
+
+# The weight of a new RTT sample in the smoothed RTT (RFC 6298).
+ALPHA = 0.125
+
+OK = "ok"
+DEGRADED = "degraded"
+DEAD = "dead"
+
+
+class Heartbeat:
+    def __init__(self, client, interval, on_change=lambda heartbeat: None):
+        """Given a repl.Client, an interval in seconds, and a function to call
+        with this heartbeat whenever its description changes, initialize a new
+        heartbeat."""
+        self.client = client
+        self.interval = interval
+        self.on_change = on_change
+        self.description = None
+        self.srtt = None
+        self.missed = 0
+        self.status = OK
+        self.timer = None
+        self.stopped = False
+
+    def start(self):
+        self.timer = reactor.call_later(self.interval, self.beat)
+        return self
+
+    def stop(self):
+        self.stopped = True
+
+        if self.timer:
+            self.timer.cancel()
+
+    def beat(self):
+        """Send an :echo op and schedule the next beat.
+
+        A beat that gets no response before the next beat is due counts as
+        missed."""
+        if self.stopped:
+            return
+
+        sent = time.monotonic()
+
+        self.client.send_op(
+            {"op": edn.Keyword("echo")},
+            lambda response: self.pong(response, sent),
+            self.interval,
+        )
+
+        self.timer = reactor.call_later(self.interval, self.beat)
+
+    def pong(self, response, sent):
+        if self.stopped:
+            return
+
+        if response.get(edn.Keyword("timeout")):
+            self.missed += 1
+        else:
+            rtt = time.monotonic() - sent
+            self.srtt = (
+                rtt if self.srtt is None else self.srtt + ALPHA * (rtt - self.srtt)
+            )
+            self.missed = 0
+
+        if self.missed >= DEAD_AFTER:
+            status = DEAD
+        elif self.missed >= DEGRADED_AFTER:
+            status = DEGRADED
+        else:
+            status = OK
+
+        if status != self.status:
+            log.warning("heartbeat/status", status=status, missed=self.missed)
+            self.status = status
+
+            if status == DEAD:
+                seconds = self.missed * self.interval
+                reason = f"[Tutkain] The runtime has not responded for {seconds:g} seconds.\n"
+                self.client.ops_client().fail(reason)
+
+        if (description := self.describe()) != self.description:
+            self.description = description
+            self.on_change(self)
+
+    def describe(self):
+        """Return a short description of the status and the smoothed RTT of
+        this heartbeat for the status bar, or None if there's nothing to tell
+        yet."""
+        if self.status == DEAD:
+            return "not responding"
+
+        rtt = self.srtt is not None and f"{self.srtt * 1000:.0f} ms"
+
+        if self.status == DEGRADED:
+            return f"degraded · {rtt}" if rtt else "degraded"
+
+        return rtt or None
@@ -0,0 +1,75 @@
+"""A least-recently-used cache of responses to :lookup ops.
+
+Keyed by client ID, dialect, namespace, and symbol. Evaluating, loading, or
+testing code in a namespace invalidates the entries for that namespace."""
+
+import collections
+from threading import Lock
+
+from ...api import edn
+
+
+def ns_name(ns):
+    """Given a namespace name as a string or an edn.Symbol, return it as a
+    string."""
+    return ns.name if isinstance(ns, edn.Symbol) else ns
+
+
+class LookupCache:
+    def __init__(self, maxsize=1000):
+        self.maxsize = maxsize
+        self.entries = collections.OrderedDict()
+        self.lock = Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """Given a key, return the cached response for the key, or None."""
+        with self.lock:
+            if (response := self.entries.get(key)) is not None:
+                self.entries.move_to_end(key)
+
+            return response
+
+    def put(self, key, response):
+        """Given a key and a response to a :lookup op, cache the response,
+        unless it's an error."""
+        if response.get(edn.Keyword("tag")) == edn.Keyword("err"):
+            return
+
+        with self.lock:
+            self.entries[key] = response
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, client_id, ns=None):
+        """Given a client ID and, optionally, a namespace name, remove the
+        entries of the client that were looked up in the namespace or that
+        resolve to a var in the namespace.
+
+        Without a namespace, remove every entry of the client."""
+        ns = ns_name(ns)
+
+        def stale(key, response):
+            if key[0] != client_id:
+                return False
+
+            if ns is None or key[2] == ns:
+                return True
+
+            info = response.get(edn.Keyword("info"))
+            return isinstance(info, dict) and ns_name(info.get(edn.Keyword("ns"))) == ns
+
+        with self.lock:
+            for key in [key for key, val in self.entries.items() if stale(key, val)]:
+                del self.entries[key]
+
+
+cache = LookupCache()
+
+
+def key(client, dialect, ns, symbol):
+    return (client.id, dialect, ns_name(ns), symbol)
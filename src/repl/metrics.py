@@ -0,0 +1,220 @@
+"""Fixed-bucket histograms of the round-trip latencies and response sizes of
+the ops a client sends.
+
+Recording a value takes constant memory: a histogram only counts how many
+values fall into each bucket. A percentile is therefore only as precise as
+the bucket it falls into."""
+
+import bisect
+import collections
+from threading import Lock
+
+# Upper bounds (in seconds) of the buckets of a latency histogram.
+LATENCY_BOUNDS = (
+    0.001,
+    0.002,
+    0.005,
+    0.01,
+    0.02,
+    0.05,
+    0.1,
+    0.2,
+    0.5,
+    1,
+    2,
+    5,
+    10,
+    30,
+    60,
+)
+
+# Upper bounds (in characters) of the buckets of a size histogram.
+SIZE_BOUNDS = (
+    64,
+    256,
+    1024,
+    4096,
+    16384,
+    65536,
+    262144,
+    1048576,
+    4194304,
+)
+
+PERCENTILES = (50, 95, 99)
+
+
+class Histogram:
+    """A histogram with one bucket per upper bound, plus one bucket for the
+    values that exceed the largest upper bound."""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, p):
+        """Given a percentile (0–100), return the upper bound of the bucket the
+        percentile falls into, or None if the histogram is empty.
+
+        Never return more than the largest value recorded."""
+        if not self.count:
+            return None
+
+        rank = p / 100 * self.count
+        seen = 0
+
+        for i, n in enumerate(self.counts):
+            seen += n
+
+            if n and seen >= rank:
+                return (
+                    min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+                )
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+
+class Metrics:
+    """Histograms of the latencies, handling times, and response sizes of a
+    client's ops, keyed by op.
+
+    The latency of an op is the time from registering the handler of the op
+    to the arrival of the response. The handling time of an op is the time the
+    plugin spends in the handlers of the response."""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.latencies = collections.defaultdict(lambda: Histogram(LATENCY_BOUNDS))
+        self.handling = collections.defaultdict(lambda: Histogram(LATENCY_BOUNDS))
+        self.sizes = collections.defaultdict(lambda: Histogram(SIZE_BOUNDS))
+        self.timeouts = collections.Counter()
+        self.peak_inflight = 0
+
+    def record_latency(self, op, seconds):
+        with self.lock:
+            self.latencies[op].record(seconds)
+
+    def record_handling(self, op, seconds):
+        with self.lock:
+            self.handling[op].record(seconds)
+
+    def record_size(self, op, size):
+        with self.lock:
+            self.sizes[op].record(size)
+
+    def record_timeout(self, op):
+        with self.lock:
+            self.timeouts[op] += 1
+
+    def record_inflight(self, n):
+        with self.lock:
+            self.peak_inflight = max(self.peak_inflight, n)
+
+    def snapshot(self):
+        """Return a dict of op to a dict of the percentiles of each histogram of
+        the op."""
+
+        def summary(histogram):
+            return {
+                "count": histogram.count,
+                "mean": histogram.mean(),
+                "max": histogram.max,
+                **{f"p{p}": histogram.percentile(p) for p in PERCENTILES},
+            }
+
+        with self.lock:
+            ops = (
+                set(self.latencies)
+                | set(self.handling)
+                | set(self.sizes)
+                | set(self.timeouts)
+            )
+
+            return {
+                op: {
+                    "latency": summary(self.latencies[op]),
+                    "handling": summary(self.handling[op]),
+                    "size": summary(self.sizes[op]),
+                    "timeouts": self.timeouts[op],
+                }
+                for op in ops
+            }
+
+
+def format_seconds(seconds):
+    if seconds is None:
+        return "-"
+    elif seconds < 1:
+        return f"{seconds * 1000:.0f} ms"
+    else:
+        return f"{seconds:.1f} s"
+
+
+def format_size(size):
+    if size is None:
+        return "-"
+    elif size < 1024:
+        return f"{size:.0f} B"
+    elif size < 1048576:
+        return f"{size / 1024:.0f} KiB"
+    else:
+        return f"{size / 1048576:.1f} MiB"
+
+
+def render(name, stats, snapshot):
+    """Given the name of a connection, the stats of the client of the
+    connection, and a snapshot of the metrics of the client, return a plain
+    text report of the metrics."""
+    lines = [
+        name,
+        "",
+        f"  In flight: {stats['outstanding']} (peak {stats['peak']})",
+        f"  Timed out: {stats['expired']}",
+        "",
+    ]
+
+    columns = "  {:<20} {:>7} {:>9} {:>9} {:>9} {:>9}"
+
+    for title, key, fmt in (
+        ("Round-trip latency", "latency", format_seconds),
+        ("Time in handlers", "handling", format_seconds),
+        ("Response size", "size", format_size),
+    ):
+        lines.append(columns.format(title, "count", "p50", "p95", "p99", "max"))
+
+        for op, metrics in sorted(snapshot.items(), key=lambda item: str(item[0])):
+            summary = metrics[key]
+
+            if summary["count"]:
+                lines.append(
+                    columns.format(
+                        str(op),
+                        summary["count"],
+                        fmt(summary["p50"]),
+                        fmt(summary["p95"]),
+                        fmt(summary["p99"]),
+                        fmt(summary["max"]),
+                    )
+                )
+
+        lines.append("")
+
+    if timeouts := {op: m["timeouts"] for op, m in snapshot.items() if m["timeouts"]}:
+        lines.append("  Timeouts by op")
+
+        for op, n in sorted(timeouts.items(), key=lambda item: str(item[0])):
+            lines.append(f"  {str(op):<20} {n:>7}")
+
+        lines.append("")
+
+    return "\n".join(lines)
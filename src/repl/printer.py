@@ -1,9 +1,12 @@
+import queue
+import time
+
 import sublime
 
 from .. import settings, state
 from ..log import log
-from . import views
-from .keywords import ERR, RET, IN, TAG, TAP, VAL
+from . import formatter, spool, views
+from .keywords import ERR, OUT, RET, IN, TAG, TAP, VAL
 
 
 def show_repl_panel(view):
@@ -15,8 +18,35 @@ def show_repl_panel(view):
         views.show_output_panel(sublime.active_window())
 
 
+def trim(view):
+    """Given a view, if the view holds more characters than the
+    `output_max_characters` setting allows, remove whole lines from the start
+    of the view.
+
+    Removes a quarter of the limit more than necessary, so that the view
+    needn't be trimmed on every append. Return the number of characters
+    removed."""
+    limit = settings.load().get("output_max_characters", 0)
+
+    if not limit or (size := view.size()) <= limit:
+        return 0
+
+    n = size - limit + limit // 4
+
+    if (newline := view.find("\n", n, sublime.LITERAL)).a != -1:
+        n = newline.b
+
+    view.run_command("tutkain_trim_output_view_impl", {"size": n})
+    state.shift_gutter_markers(view, n)
+    return n
+
+
 def append_to_view(view, characters):
+    """Given a view and a string, append the string to the view, then trim
+    the view. Return the number of characters trimmed from the start of the
+    view."""
     show_repl_panel(view)
+    trimmed = 0
 
     if view and characters:
         view.set_read_only(False)
@@ -26,9 +56,12 @@ def append_to_view(view, characters):
                 "append", {"characters": characters, "scroll_to_end": True}
             )
 
+        trimmed = trim(view)
         view.set_read_only(True)
         view.run_command("move_to", {"to": "eof"})
 
+    return trimmed
+
 
 def append_to_tap_panel(view, val):
     if settings.load().get("tap_panel", False):
@@ -38,15 +71,6 @@ def append_to_tap_panel(view, val):
         append_to_view(panel, val)
 
 
-def print_item(view, item):
-    characters = item.get(VAL)
-
-    if item.get(TAG) == TAP:
-        append_to_tap_panel(view, characters)
-    else:
-        append_to_view(view, characters)
-
-
 TAG_ICONS = {
     IN: "chevron-right",
     ERR: "chevron-left",
@@ -67,19 +91,17 @@ def icon_path(tag):
         return ""
 
 
-def add_gutter_marks(view, client, item):
-    tag = item.get(TAG)
-    key = f"tutkain_gutter_marks/{tag.name}"
-    point = view.size() - len(item.get(VAL))
-    region = sublime.Region(point, point)
-
-    if tag in state.MARKER_TAGS and (markers := state.get_gutter_markers(view)):
-        markers[tag].append(region)
+def add_gutter_marks(view, marks):
+    """Given a view and a dict of tags to lists of points, add a gutter mark at
+    every point and redraw the gutter marks of every tag once."""
+    if markers := state.get_gutter_markers(view):
+        for tag, points in marks.items():
+            tag_markers = markers[tag]
+            tag_markers.extend(points)
 
-        if tag_markers := markers.get(tag):
             view.add_regions(
-                key,
-                tag_markers,
+                f"tutkain_gutter_marks/{tag.name}",
+                tag_markers.regions(),
                 scope=TAG_SCOPES.get(tag, "source"),
                 icon=icon_path(tag),
                 # TODO: sublime.PERSISTENT?
@@ -87,15 +109,137 @@ def add_gutter_marks(view, client, item):
             )
 
 
-def print_loop(view, client, options={"gutter_marks": True}):
+# The shortest time between two flushes of output into a view, in seconds.
+FRAME_INTERVAL = 1 / 30
+
+
+def print_items(view, items, gutter_marks=True):
+    """Given a view and a list of items, print the items into the view in as
+    few appends as possible.
+
+    Coalesces consecutive items that go to the same view or panel into a
+    single append, then adds the gutter marks for every item at once."""
+    end = view.size()
+    marks = {}
+    tap_chunks = []
+    view_chunks = []
+
+    def flush_view():
+        nonlocal end
+        characters = "".join(view_chunks)
+        view_chunks.clear()
+
+        if settings.load().get("output_max_characters", 0):
+            spool.get(view).write(characters)
+
+        if trimmed := append_to_view(view, characters):
+            end -= trimmed
+
+            for points in marks.values():
+                points[:] = [point - trimmed for point in points if point >= trimmed]
+
+    def flush_tap_panel():
+        append_to_tap_panel(view, "".join(tap_chunks))
+        tap_chunks.clear()
+
+    for item in items:
+        characters = item.get(VAL) or ""
+
+        if item.get(TAG) == TAP:
+            view_chunks and flush_view()
+            tap_chunks.append(characters)
+        else:
+            tap_chunks and flush_tap_panel()
+            view_chunks.append(characters)
+            end += len(characters)
+
+        if gutter_marks and (tag := item.get(TAG)) in state.MARKER_TAGS:
+            marks.setdefault(tag, []).append(max(0, end - len(characters)))
+
+    view_chunks and flush_view()
+    tap_chunks and flush_tap_panel()
+
+    if marks:
+        add_gutter_marks(view, marks)
+
+
+# The tags of the items a PrintQueue may drop.
+DROPPABLE_TAGS = {OUT, ERR, TAP}
+
+
+class PrintQueue(queue.Queue):
+    """A queue of items to print into a REPL view.
+
+    Holds at most `maxlen` items. If the queue is full, drops standard output,
+    standard error, and tap items, and counts them instead. Never drops any
+    other item (such as an evaluation result) or the sentinel None that ends
+    the queue."""
+
+    def __init__(self, maxlen=10000):
+        super().__init__()
+        self.maxlen = maxlen
+        self.suppressed = 0
+
+    def put(self, item, block=True, timeout=None):
+        if (
+            isinstance(item, dict)
+            and item.get(TAG) in DROPPABLE_TAGS
+            and self.qsize() >= self.maxlen
+        ):
+            with self.mutex:
+                self.suppressed += 1
+        else:
+            super().put(item, block, timeout)
+
+    def take_suppressed(self):
+        """Return the number of items this queue has dropped since the last
+        call and reset the count."""
+        with self.mutex:
+            suppressed, self.suppressed = self.suppressed, 0
+            return suppressed
+
+
+def suppressed_item(n):
+    return formatter.format(
+        {TAG: ERR, VAL: f"[Tutkain] Output overflow: {n} messages suppressed.\n"}
+    )
+
+
+def drain(q, batch):
+    """Given a queue and a list, move every item in the queue into the list
+    without blocking.
+
+    Return False if the queue has ended, True otherwise."""
     try:
-        log.debug({"event": "thread/start"})
+        while (item := q.get_nowait()) is not None:
+            batch.append(item)
 
-        while item := client.printq.get():
-            print_item(view, item)
+        return False
+    except queue.Empty:
+        return True
 
-            if options.get("gutter_marks", True):
-                add_gutter_marks(view, client, item)
 
+def print_loop(view, client, options={"gutter_marks": True}):
+    try:
+        log.debug("thread/start")
+        gutter_marks = options.get("gutter_marks", True)
+        running = True
+        flushed = 0
+
+        while running and (item := client.printq.get()) is not None:
+            batch = [item]
+            running = drain(client.printq, batch)
+
+            # Let the output that arrives within a frame interval of the
+            # previous flush accumulate, then print all of it at once.
+            if running and (delay := flushed + FRAME_INTERVAL - time.monotonic()) > 0:
+                time.sleep(delay)
+                running = drain(client.printq, batch)
+
+            if n := client.printq.take_suppressed():
+                batch.append(suppressed_item(n))
+
+            print_items(view, batch, gutter_marks)
+            flushed = time.monotonic()
     finally:
-        log.debug({"event": "thread/exit"})
+        log.debug("thread/exit")
@@ -0,0 +1,314 @@
+"""An I/O reactor that owns the socket of every connection to a Clojure
+runtime.
+
+A single thread waits on every socket with a selector, reads from the
+sockets that have data, and writes whatever other threads have queued for
+the sockets that can take more. Adding a connection doesn't add a thread."""
+
+import collections
+import selectors
+import socket
+from threading import Lock, Thread
+
+from ..log import log
+from .timers import TimerWheel
+
+BUFFER_SIZE = 65536
+
+# The maximum number of urgent frames to write in a row while other frames
+# are waiting.
+MAX_URGENT_STREAK = 32
+
+
+class Connection:
+    """A non-blocking socket connection the reactor reads from and writes
+    into.
+
+    Queues every frame (a bytes-like object) written into the connection
+    until the socket can take it. Writes urgent frames ahead of other frames,
+    but never more than MAX_URGENT_STREAK urgent frames in a row while other
+    frames are waiting. Never interleaves the bytes of two frames.
+
+    Calls `on_recv` with every chunk of bytes the socket receives and
+    `on_close` once the connection has closed, both on the reactor thread."""
+
+    def __init__(self, reactor, sock, name, on_recv, on_close):
+        self.reactor = reactor
+        self.sock = sock
+        self.name = name
+        self.on_recv = on_recv
+        self.on_close = on_close
+        self.lock = Lock()
+        self.urgent = collections.deque()
+        self.bulk = collections.deque()
+        self.streak = 0
+        self.outbuf = memoryview(b"")
+        self.events = 0
+        self.started = False
+        self.flush_scheduled = False
+        self.closing = False
+        self.closed = False
+
+    def start(self):
+        """Start reading from and writing into the socket of this
+        connection.
+
+        Until then, the connection only buffers what's written into it."""
+        self.sock.setblocking(False)
+
+        with self.lock:
+            self.started = True
+
+        self.reactor.call_soon(self.register)
+
+    def register(self):
+        self.events = selectors.EVENT_READ
+        self.reactor.selector.register(self.sock, self.events, self)
+        log.debug("reactor/register", connection=self.name)
+        self.flush()
+
+    def write(self, data, urgent=False):
+        """Given a bytes-like object, queue the bytes for writing into the
+        socket of this connection as a single frame.
+
+        If `urgent` is true, write the frame ahead of the non-urgent frames
+        already in the queue."""
+        with self.lock:
+            if self.closing:
+                return
+
+            (self.urgent if urgent else self.bulk).append(data)
+
+            if not self.started or self.flush_scheduled:
+                return
+
+            self.flush_scheduled = True
+
+        self.reactor.call_soon(self.flush)
+
+    def close(self):
+        """Close this connection once everything written into it has been
+        sent."""
+        with self.lock:
+            if self.closing:
+                return
+
+            self.closing = True
+            started = self.started
+
+        if started:
+            self.reactor.call_soon(self.flush)
+        else:
+            try:
+                self.sock.close()
+            except OSError as error:
+                log.debug("error", exception=error)
+
+    def next_frame(self):
+        if self.urgent and (not self.bulk or self.streak < MAX_URGENT_STREAK):
+            self.streak = self.streak + 1 if self.bulk else 0
+            return self.urgent.popleft()
+        elif self.bulk:
+            self.streak = 0
+            return self.bulk.popleft()
+
+    def fill(self):
+        """Once the buffer of bytes to send is empty, refill it with up to
+        BUFFER_SIZE bytes worth of queued frames, in priority order."""
+        if not self.outbuf:
+            buffer = bytearray()
+
+            while (
+                len(buffer) < BUFFER_SIZE and (frame := self.next_frame()) is not None
+            ):
+                buffer += frame
+
+            self.outbuf = memoryview(buffer)
+
+    def clear(self):
+        self.urgent.clear()
+        self.bulk.clear()
+        self.outbuf = memoryview(b"")
+
+    def flush(self):
+        if self.closed:
+            return
+
+        with self.lock:
+            self.flush_scheduled = False
+            self.fill()
+
+            while self.outbuf:
+                try:
+                    sent = self.sock.send(self.outbuf)
+                except BlockingIOError:
+                    break
+                except OSError as error:
+                    log.error("reactor/send-error", error=error)
+                    self.clear()
+                    self.closing = True
+                    break
+
+                self.outbuf = self.outbuf[sent:]
+
+                if self.outbuf:
+                    # The socket can't take more right now.
+                    break
+
+                self.fill()
+
+            pending = bool(self.outbuf)
+            closing = self.closing
+
+        if not pending and closing:
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError as error:
+                log.debug("error", exception=error)
+
+            self.disconnect()
+        else:
+            self.listen(
+                selectors.EVENT_READ | (selectors.EVENT_WRITE if pending else 0)
+            )
+
+    def listen(self, events):
+        if events != self.events:
+            self.events = events
+            self.reactor.selector.modify(self.sock, events, self)
+
+    def readable(self):
+        try:
+            data = self.sock.recv(BUFFER_SIZE)
+        except BlockingIOError:
+            return
+        except OSError as error:
+            log.error("reactor/recv-error", error=error)
+            data = b""
+
+        if not data:
+            self.disconnect()
+            return
+
+        # Clients catch the errors their response handlers raise, so an error
+        # here means the client can't make sense of what the socket receives.
+        try:
+            self.on_recv(data)
+        except Exception as error:
+            log.error("reactor/decode-error", connection=self.name, error=error)
+
+            self.disconnect()
+
+    def disconnect(self):
+        if self.closed:
+            return
+
+        self.closed = True
+
+        with self.lock:
+            self.closing = True
+            self.clear()
+
+        try:
+            self.reactor.selector.unregister(self.sock)
+        except (KeyError, ValueError):
+            pass
+
+        try:
+            self.sock.close()
+        except OSError as error:
+            log.debug("error", exception=error)
+
+        log.debug("reactor/disconnect", connection=self.name)
+
+        try:
+            self.on_close()
+        except Exception as error:
+            log.error("reactor/close-error", error=error)
+
+
+class Reactor:
+    """A selector loop running in a thread of its own.
+
+    Other threads talk to the loop by scheduling functions to run on it with
+    `call_soon` and `call_later`."""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.tasks = collections.deque()
+        self.timers = TimerWheel()
+        self.selector = None
+        self.thread = None
+
+    def ensure_started(self):
+        with self.lock:
+            if self.thread:
+                return
+
+            self.selector = selectors.DefaultSelector()
+            self.wakeup_recv, self.wakeup_send = socket.socketpair()
+            self.wakeup_recv.setblocking(False)
+            self.wakeup_send.setblocking(False)
+            self.selector.register(self.wakeup_recv, selectors.EVENT_READ)
+            self.thread = Thread(daemon=True, target=self.run, name="tutkain.reactor")
+            self.thread.start()
+
+    def call_soon(self, f):
+        """Given a function, call the function on the reactor thread."""
+        self.ensure_started()
+        self.tasks.append(f)
+
+        try:
+            self.wakeup_send.send(b"\0")
+        except (BlockingIOError, OSError):
+            # The reactor is already due to wake up.
+            pass
+
+    def call_later(self, delay, f):
+        """Given a delay in seconds and a function, call the function on the
+        reactor thread once the delay has passed. Return a timers.Timer."""
+        idle = not self.timers
+        timer = self.timers.schedule(delay, f)
+
+        # If the wheel was empty, the reactor might be waiting without a
+        # timeout; wake it up so that it starts ticking the wheel.
+        idle and self.call_soon(lambda: None)
+        return timer
+
+    def connection(self, sock, name, on_recv, on_close):
+        """Given a connected socket, a name for the connection, a function to
+        call with every chunk of bytes the socket receives, and a function to
+        call once the connection closes, return a new Connection."""
+        self.ensure_started()
+        return Connection(self, sock, name, on_recv, on_close)
+
+    def run(self):
+        while True:
+            for key, events in self.selector.select(self.timers.timeout()):
+                if key.data is None:
+                    try:
+                        while self.wakeup_recv.recv(BUFFER_SIZE):
+                            pass
+                    except BlockingIOError:
+                        pass
+                else:
+                    connection = key.data
+
+                    if events & selectors.EVENT_WRITE and not connection.closed:
+                        connection.flush()
+
+                    if events & selectors.EVENT_READ and not connection.closed:
+                        connection.readable()
+
+            self.tasks.extend(self.timers.advance())
+
+            while self.tasks:
+                task = self.tasks.popleft()
+
+                try:
+                    task()
+                except Exception as error:
+                    log.error("reactor/task-error", error=error)
+
+
+reactor = Reactor()
@@ -0,0 +1,84 @@
+"""Append-only transcripts of everything Tutkain prints into a REPL view.
+
+Tutkain trims old output from the head of a REPL view once the view grows
+past the size limit in the `output_max_characters` setting. The spool file
+of the view retains the full transcript."""
+
+import datetime
+import os
+import threading
+import time
+
+import sublime
+
+from ..log import log
+
+SPOOL_DIR = os.path.join(sublime.cache_path(), "Tutkain", "spool")
+
+# Delete spool files older than this many seconds.
+MAX_AGE = 7 * 24 * 60 * 60
+
+lock = threading.Lock()
+spools = {}
+
+
+class Spool:
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def write(self, characters):
+        try:
+            if self.file is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self.file = open(self.path, "a", encoding="utf-8")
+
+            self.file.write(characters)
+            self.file.flush()
+        except OSError as error:
+            log.error("spool/write-error", path=self.path, error=error)
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+def delete_old_spools():
+    try:
+        threshold = time.time() - MAX_AGE
+
+        for entry in os.scandir(SPOOL_DIR):
+            if entry.is_file() and entry.stat().st_mtime < threshold:
+                os.remove(entry.path)
+    except OSError as error:
+        log.debug("error", exception=error)
+
+
+def get(view):
+    """Given a REPL view, return the spool of the view, creating it if
+    necessary."""
+    with lock:
+        if not (spool := spools.get(view.id())):
+            if not spools:
+                delete_old_spools()
+
+            timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+            spool = Spool(os.path.join(SPOOL_DIR, f"{timestamp}-{view.id()}.repl"))
+            spools[view.id()] = spool
+
+        return spool
+
+
+def find(view):
+    """Given a REPL view, return the spool of the view, or None if the view has
+    no spool."""
+    with lock:
+        return view and spools.get(view.id())
+
+
+def close(view):
+    """Given a REPL view, close the spool of the view."""
+    with lock:
+        if spool := spools.pop(view.id(), None):
+            spool.close()
@@ -0,0 +1,89 @@
+"""A hashed timer wheel for coarse-grained timeouts.
+
+Scheduling and cancelling a timer takes constant time. Advancing the wheel
+by one tick only looks at the timers in one slot of the wheel."""
+
+import math
+import time
+from threading import Lock
+
+
+class Timer:
+    def __init__(self, wheel, slot, rounds, f):
+        self.wheel = wheel
+        self.slot = slot
+        self.rounds = rounds
+        self.f = f
+
+    def cancel(self):
+        """Cancel this timer, unless it has already fired."""
+        self.wheel.cancel(self)
+
+
+class TimerWheel:
+    """A ring of `slots` slots, each `tick` seconds wide.
+
+    A timer that's due further into the future than one revolution of the
+    wheel waits in its slot for the remaining number of revolutions."""
+
+    def __init__(self, tick=0.5, slots=256):
+        self.tick = tick
+        self.slots = [set() for _ in range(slots)]
+        self.lock = Lock()
+        self.cursor = 0
+        self.ticked = time.monotonic()
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def schedule(self, delay, f):
+        """Given a delay in seconds and a function, call the function once
+        the wheel has advanced past the delay. Return a Timer."""
+        ticks = max(1, math.ceil(delay / self.tick))
+
+        with self.lock:
+            if not self.count:
+                # Don't fire a new timer early because the wheel sat idle.
+                self.ticked = time.monotonic()
+
+            n = len(self.slots)
+            timer = Timer(self, (self.cursor + ticks) % n, (ticks - 1) // n, f)
+            self.slots[timer.slot].add(timer)
+            self.count += 1
+            return timer
+
+    def cancel(self, timer):
+        with self.lock:
+            if timer in self.slots[timer.slot]:
+                self.slots[timer.slot].remove(timer)
+                self.count -= 1
+
+    def timeout(self):
+        """Return the number of seconds until the next tick of the wheel, or
+        None if the wheel has no timers."""
+        with self.lock:
+            if self.count:
+                return max(0, self.ticked + self.tick - time.monotonic())
+
+    def advance(self, now=None):
+        """Advance the wheel to the given time (default: now). Return the
+        functions of the timers that have come due."""
+        now = time.monotonic() if now is None else now
+        due = []
+
+        with self.lock:
+            while self.count and self.ticked + self.tick <= now:
+                self.ticked += self.tick
+                self.cursor = (self.cursor + 1) % len(self.slots)
+                slot = self.slots[self.cursor]
+
+                for timer in list(slot):
+                    if timer.rounds:
+                        timer.rounds -= 1
+                    else:
+                        slot.remove(timer)
+                        self.count -= 1
+                        due.append(timer.f)
+
+        return due
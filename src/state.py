@@ -1,4 +1,4 @@
-from collections import defaultdict, deque
+from collections import defaultdict
 from dataclasses import dataclass
 from typing import TypedDict, Union
 
@@ -6,6 +6,7 @@ from sublime import View, Window
 
 from ..api import edn
 from . import dialects, repl, progress, status
+from .repl import gutter
 
 WindowId = int
 ViewId = int
@@ -57,6 +58,13 @@ def reset_gutter_markers(view: View) -> None:
             __state["gutter_markers"].get(view.id(), {}).get(tag, []).clear()
 
 
+def shift_gutter_markers(view: View, n: int) -> None:
+    """Given a view and the number of characters removed from the start of
+    the view, move the gutter markers of the view to match."""
+    for markers in __state["gutter_markers"].get(view.id(), {}).values():
+        markers.shift(n)
+
+
 def get_gutter_markers(view: View):
     if not view:
         return {}
@@ -69,7 +77,7 @@ def register_connection(view: View, window: Window, client: repl.Client) -> None
 
     for tag in MARKER_TAGS:
         if not __state["gutter_markers"].get(view.id(), {}).get(tag):
-            __state["gutter_markers"][view.id()][tag] = deque([], 1000)
+            __state["gutter_markers"][view.id()][tag] = gutter.Marks(1000)
 
     def forget_connection():
         progress.stop()
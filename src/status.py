@@ -3,10 +3,12 @@ from . import dialects
 
 def set_connection_status(view, client):
     if view and dialects.for_view(view):
-        view.set_status(
-            "tutkain_connection_status",
-            f"⚡ {client.host}:{client.port} ({dialects.name(client.dialect)})",
-        )
+        text = f"⚡ {client.host}:{client.port} ({dialects.name(client.dialect)})"
+
+        if client.heartbeat and (description := client.heartbeat.describe()):
+            text = f"{text} · {description}"
+
+        view.set_status("tutkain_connection_status", text)
 
 
 def erase_connection_status(view):
@@ -101,6 +101,14 @@ class JvmBackchannelServer(JvmServer):
         )
 
         # Client loads modules
+        # Client asks which modules the runtime has already loaded
+        op = edn.read(backchannel.recv())
+        backchannel.send(
+            edn.kwmap(
+                {"id": op.get(edn.Keyword("id")), "tag": edn.Keyword("ret"), "val": []}
+            )
+        )
+
         for _ in range(9):
             module = edn.read(backchannel.recv())
 
@@ -151,6 +159,14 @@ class JvmRpcServer(JvmServer):
         )
 
         # Client loads modules
+        # Client asks which modules the runtime has already loaded
+        op = edn.read(self.recv())
+        self.send(
+            edn.kwmap(
+                {"id": op.get(edn.Keyword("id")), "tag": edn.Keyword("ret"), "val": []}
+            )
+        )
+
         for _ in range(9):
             module = edn.read(self.recv())
 
@@ -217,6 +233,14 @@ class JsServer(Backchannel):
             edn.kwmap({"tag": edn.Keyword("out"), "val": "ClojureScript 1.10.844\n"})
         )
 
+        # Client asks which modules the runtime has already loaded
+        op = edn.read(self.recv())
+        self.send(
+            edn.kwmap(
+                {"id": op.get(edn.Keyword("id")), "tag": edn.Keyword("ret"), "val": []}
+            )
+        )
+
         for _ in range(8):
             module = edn.read(self.recv())
 
@@ -282,6 +306,14 @@ class BabashkaServer(PlainServer):
         )
 
         # Client loads modules
+        # Client asks which modules the runtime has already loaded
+        op = edn.read(backchannel.recv())
+        backchannel.send(
+            edn.kwmap(
+                {"id": op.get(edn.Keyword("id")), "tag": edn.Keyword("ret"), "val": []}
+            )
+        )
+
         for _ in range(6):
             module = edn.read(backchannel.recv())
 
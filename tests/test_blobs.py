@@ -0,0 +1,49 @@
+import base64
+import os
+import tempfile
+import zlib
+from unittest import TestCase
+
+from Tutkain.src import blobs
+
+
+class TestBlobs(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.dir.name, "cache")
+        self.path = os.path.join(self.dir.name, "module.clj")
+        self.write("(ns my.module)")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write(self, source, mtime_ns=1_000_000_000):
+        with open(self.path, "w") as file:
+            file.write(source)
+
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def test_load(self):
+        blob = blobs.load(self.path, cache_dir=self.cache_dir)
+        self.assertFalse(blob.deflated)
+        self.assertEqual(b"(ns my.module)", base64.b64decode(blob.data))
+
+        deflated = blobs.load(self.path, deflate=True, cache_dir=self.cache_dir)
+        self.assertTrue(deflated.deflated)
+        self.assertEqual(
+            b"(ns my.module)", zlib.decompress(base64.b64decode(deflated.data))
+        )
+        self.assertEqual(blob.digest, deflated.digest)
+
+    def test_disk_cache(self):
+        blob = blobs.load(self.path, cache_dir=self.cache_dir)
+        blobs.blobs.clear()
+        self.assertEqual(blob, blobs.load(self.path, cache_dir=self.cache_dir))
+        self.assertEqual(1, len(os.listdir(self.cache_dir)))
+
+    def test_invalidate(self):
+        blob = blobs.load(self.path, cache_dir=self.cache_dir)
+        self.write("(ns my.module) (def x 1)", mtime_ns=2_000_000_000)
+        changed = blobs.load(self.path, cache_dir=self.cache_dir)
+        self.assertNotEqual(blob.digest, changed.digest)
+        self.assertEqual(b"(ns my.module) (def x 1)", base64.b64decode(changed.data))
@@ -29,7 +29,7 @@ class TestBabashkaClient(PackageTestCase):
         self.output_view = repl.views.get_or_create_view(
             self.window, "view", edn.Keyword("bb")
         )
-        repl.start(self.output_view, self.client)
+        repl.start(self.output_view, self.client).result(timeout=5)
         self.server = server.connection.result(timeout=5)
         self.client.printq.get(timeout=5)
 
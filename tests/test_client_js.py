@@ -27,7 +27,7 @@ class TestJSClient(PackageTestCase):
         self.output_view = repl.views.get_or_create_view(
             self.window, "view", edn.Keyword("cljs")
         )
-        repl.start(self.output_view, self.client)
+        repl.start(self.output_view, self.client).result(timeout=5)
         self.server = server.connection.result(timeout=5)
         self.client.printq.get(timeout=5)
 
@@ -1,12 +1,14 @@
 import os
 import queue
 import tempfile
+import time
 
 import sublime
 import unittesting
 
 from Tutkain.api import edn
 from Tutkain.src import base64, repl, test
+from Tutkain.src.repl import lookups
 
 from .mock import JvmBackchannelServer, JvmRpcServer, JvmServer
 from .util import PackageTestCase
@@ -39,7 +41,7 @@ class TestJVMClient(PackageTestCase):
         self.output_view = repl.views.get_or_create_view(
             self.window, "view", edn.Keyword("clj")
         )
-        repl.start(self.output_view, self.client)
+        repl.start(self.output_view, self.client).result(timeout=5)
         self.server = server.connection.result(timeout=5)
         self.client.printq.get(timeout=5)
 
@@ -433,6 +435,19 @@ class TestJVMClient(PackageTestCase):
         self.server.send(":a")
         self.assertEquals(ret(":a\n"), self.get_print())
 
+    def respond_to_lookup(self, op):
+        self.server.backchannel.send(edn.kwmap({"id": op[edn.Keyword("id")]}))
+
+        # Wait for the client to handle the response, so that the client
+        # doesn't coalesce the next lookup with this one.
+        for _ in range(50):
+            if not self.client.backchannel.stats()["outstanding"]:
+                break
+
+            time.sleep(0.1)
+
+        lookups.cache.invalidate(self.client.id)
+
     # @unittest.SkipTest
     def test_lookup(self):
         self.set_view_content("(rand)")
@@ -457,6 +472,8 @@ class TestJVMClient(PackageTestCase):
                 response,
             )
 
+            self.respond_to_lookup(response)
+
     # @unittest.SkipTest
     def test_lookup_var(self):
         self.set_view_content("#'foo/bar")
@@ -479,6 +496,8 @@ class TestJVMClient(PackageTestCase):
                 response,
             )
 
+            self.respond_to_lookup(response)
+
     # @unittest.SkipTest
     def test_lookup_head(self):
         self.set_view_content("(map inc )")
@@ -502,6 +521,8 @@ class TestJVMClient(PackageTestCase):
             response,
         )
 
+        self.respond_to_lookup(response)
+
     # @unittest.SkipTest
     # def test_issue_46(self):
     #     n = io.DEFAULT_BUFFER_SIZE + 1024
@@ -982,7 +1003,7 @@ class TestJvmRpcClient(PackageTestCase):
         self.output_view = repl.views.get_or_create_view(
             self.window, "view", edn.Keyword("clj")
         )
-        repl.start(self.output_view, self.client)
+        repl.start(self.output_view, self.client).result(timeout=5)
         self.server = server.connection.result(timeout=5)
         self.client.printq.get(timeout=5)
 
@@ -1073,6 +1094,52 @@ class TestJvmRpcClient(PackageTestCase):
         self.server.send(response)
         self.assertEquals(ret("(0 1 2 3 4 5 6 7 8 9)\n", id=id), self.get_print())
 
+    # @unittest.SkipTest
+    def test_show_more_of_result(self):
+        self.set_view_content("(range 1000)")
+        self.set_selections((0, 0))
+        self.view.run_command("tutkain_evaluate", {"scope": "outermost"})
+        self.assertEquals(input("(range 1000)\n"), self.get_print())
+
+        id = edn.read(self.server.recv())[edn.Keyword("id")]
+
+        response = edn.kwmap(
+            {
+                "id": id,
+                "tag": edn.Keyword("ret"),
+                "val": "(0 1 2)\n",
+                "handle": 1,
+                "path": [],
+                "offset": 0,
+                "next-offset": 3,
+            }
+        )
+
+        self.server.send(response)
+        self.assertEquals(response, self.get_print())
+        self.assertIn("Result truncated", self.get_print()[edn.Keyword("val")])
+
+        self.view.window().run_command("tutkain_show_more_of_result")
+        result_op = edn.read(self.server.recv())
+
+        self.assertEquals(
+            edn.kwmap(
+                {
+                    "op": edn.Keyword("result"),
+                    "handle": 1,
+                    "path": [],
+                    "offset": 3,
+                    "id": result_op[edn.Keyword("id")],
+                }
+            ),
+            result_op,
+        )
+
+        self.view.window().run_command("tutkain_show_part_of_result", {"path": "[0]"})
+        result_op = edn.read(self.server.recv())
+        self.assertEquals([0], result_op[edn.Keyword("path")])
+        self.assertEquals(0, result_op[edn.Keyword("offset")])
+
 
 class TestNoBackchannelJVMClient(PackageTestCase):
     @classmethod
@@ -1090,7 +1157,7 @@ class TestNoBackchannelJVMClient(PackageTestCase):
         self.output_view = repl.views.get_or_create_view(
             self.window, "view", edn.Keyword("clj")
         )
-        repl.start(self.output_view, self.client)
+        repl.start(self.output_view, self.client).result(timeout=5)
         self.server = server.connection.result(timeout=5)
         self.client.printq.get(timeout=5)  # Swallow the initial prompt
 
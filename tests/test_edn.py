@@ -55,3 +55,96 @@ class TestEdn(TestCase):
         ]:
             edn.write_line(self.buffer, val)
             self.assertEqual(val, edn.read_line(self.buffer))
+
+    def test_read_string_escapes(self):
+        self.assertEqual('a "b" \\ c\n\td', edn.read('"a \\"b\\" \\\\ c\\n\\td"'))
+        self.assertEqual("\\n", edn.read('"\\\\n"'))
+        self.assertEqual("ab", edn.read('"a\\rb"'))
+
+    def test_read_large_escaped_string(self):
+        val = '(foo "bar")\n' * 100000
+        s = edn.write(val)
+        self.assertEqual(val, edn.read(s))
+        self.assertEqual(val, edn.read_envelope("{:val " + s + "}")[edn.Keyword("val")])
+
+    def test_read_nested(self):
+        self.assertEqual(
+            {
+                edn.Keyword("id"): 1,
+                edn.Keyword("completions"): [
+                    {
+                        edn.Keyword("trigger"): "map",
+                        edn.Keyword("type"): edn.Keyword("function"),
+                    }
+                ],
+                edn.Keyword("tags"): {edn.Symbol("a"), edn.Symbol("b", "ns")},
+            },
+            edn.read(
+                '{:id 1, :completions [{:trigger "map" :type :function}] :tags #{a ns/b}}\n'
+            ),
+        )
+
+    def test_read_unterminated(self):
+        for s in ['"foo', "[1 2", "{:a 1", '"foo\\']:
+            with self.assertRaises(EOFError):
+                edn.read(s)
+
+    def test_decoder(self):
+        decoder = edn.Decoder()
+        chunks = []
+
+        for b in '{:id 1 :val "äö\\n"}\n\n[1 2]\n{:a'.encode("utf-8"):
+            chunks.extend(decoder.feed(bytes([b])))
+
+        self.assertEqual(
+            [{edn.Keyword("id"): 1, edn.Keyword("val"): "äö\n"}, [1, 2]], chunks
+        )
+
+        decoder.feed(b" 1}")
+        self.assertEqual([{edn.Keyword("a"): 1}], decoder.finish())
+
+    def test_decoder_reader_error(self):
+        decoder = edn.Decoder()
+
+        with self.assertRaises(EOFError):
+            decoder.feed(b"[1\n")
+
+        # The decoder doesn't read the line that failed again.
+        self.assertEqual([[2]], decoder.feed(b"[2]\n"))
+
+    def test_write(self):
+        self.assertEqual(
+            '{:op :load :code "a\\"b\\\\c\\nd"}',
+            edn.write(edn.kwmap({"op": edn.Keyword("load"), "code": 'a"b\\c\nd'})),
+        )
+        self.assertEqual(
+            '[1, nil, true, ns/sym, :ns/kw, #{"x",}]',
+            edn.write(
+                [1, None, True, edn.Symbol("sym", "ns"), edn.Keyword("kw", "ns"), {"x"}]
+            ),
+        )
+
+    def test_interned(self):
+        self.assertIs(edn.Keyword("b", "a"), edn.Keyword("b", "a"))
+        self.assertIs(edn.Keyword("b", "a"), edn.read(":a/b"))
+        self.assertIs(edn.Symbol("b"), edn.read("b"))
+        self.assertNotEqual(edn.Keyword("b"), edn.Symbol("b"))
+        self.assertEqual(hash(edn.Keyword("b")), hash(edn.read(":b")))
+
+        with self.assertRaises(AttributeError):
+            edn.Keyword("b").name = "c"
+
+    def test_read_envelope(self):
+        s = '{:id 1, :tag :ret, :val "x\\n}", :xs [1 "]" {:a #{2}}]}'
+        envelope = edn.read_envelope(s)
+
+        self.assertIsInstance(envelope, dict)
+        self.assertEqual(1, envelope.get(edn.Keyword("id")))
+        self.assertEqual("x\n}", envelope[edn.Keyword("val")])
+        self.assertEqual(edn.read(s), envelope)
+        self.assertEqual(edn.read(s), {**edn.read_envelope(s)})
+        self.assertEqual([1, 2], edn.read_envelope("[1 2]"))
+
+    def test_read_envelope_skips_large_escaped_string(self):
+        s = edn.write(edn.kwmap({"val": '(foo "bar")\n' * 100000, "id": 1}))
+        self.assertEqual(1, edn.read_envelope(s).get(edn.Keyword("id")))
@@ -0,0 +1,99 @@
+from unittest import TestCase
+
+from Tutkain.api import edn
+from Tutkain.src.repl import backchannel, edn_client
+
+
+class Client(edn_client.Client):
+    pass
+
+
+class TestEdnClient(TestCase):
+    def setUp(self):
+        self.printed = []
+        self.client = Client(self.printed.append)
+
+    def test_coalesce(self):
+        responses = []
+        op = {"op": edn.Keyword("lookup"), "ident": "map", "ns": "user"}
+        message = self.client.register_handler(op, responses.append)
+        self.assertIsNotNone(message)
+
+        # Key order doesn't matter.
+        self.assertIsNone(
+            self.client.register_handler(dict(reversed(op.items())), responses.append)
+        )
+
+        self.assertEqual(
+            {"outstanding": 1, "peak": 1, "expired": 0}, self.client.stats()
+        )
+
+        response = edn.kwmap({"id": message[edn.Keyword("id")], "val": 1})
+        self.client.handle(response)
+        self.assertEqual([response, response], responses)
+        self.assertEqual(
+            {"outstanding": 0, "peak": 1, "expired": 0}, self.client.stats()
+        )
+
+        # Once the response has arrived, the next identical op goes out again.
+        self.assertIsNotNone(self.client.register_handler(op, responses.append))
+
+    def test_handler_error(self):
+        responses = []
+        op = {"op": edn.Keyword("lookup"), "ident": "map"}
+        message = self.client.register_handler(op, lambda _: 1 / 0)
+        self.client.register_handler(op, responses.append)
+
+        # A failing handler doesn't stop the other handlers of the response.
+        response = edn.kwmap({"id": message[edn.Keyword("id")], "val": 1})
+        self.client.handle(response)
+        self.assertEqual([response], responses)
+
+    def test_no_coalesce(self):
+        op = {"op": edn.Keyword("eval"), "code": "(rand)"}
+        self.assertIsNotNone(self.client.register_handler(op, self.printed.append))
+        self.assertIsNotNone(self.client.register_handler(op, self.printed.append))
+
+    def test_expire(self):
+        responses = []
+        op = {"op": edn.Keyword("lookup"), "ident": "map"}
+        message = self.client.register_handler(op, responses.append)
+        self.client.register_handler(op, responses.append)
+        self.client.expire(message)
+
+        self.assertEqual(2, len(responses))
+        self.assertTrue(all(r[edn.Keyword("timeout")] for r in responses))
+        self.assertEqual(
+            {"outstanding": 0, "peak": 1, "expired": 1}, self.client.stats()
+        )
+
+        # A late response doesn't reach the default handler.
+        self.client.handle(edn.kwmap({"id": message[edn.Keyword("id")], "val": 1}))
+        self.assertEqual([], self.printed)
+
+    def test_metrics(self):
+        message = self.client.register_handler(
+            {"op": edn.Keyword("completions"), "prefix": "ma"}, self.printed.append
+        )
+
+        id = message[edn.Keyword("id")]
+        line = edn.write(edn.kwmap({"id": id, "completions": []}))
+        self.client.handle(self.client.read(line))
+
+        snapshot = self.client.metrics.snapshot()[edn.Keyword("completions")]
+        self.assertEqual(1, snapshot["latency"]["count"])
+        self.assertEqual(1, snapshot["handling"]["count"])
+        self.assertEqual(len(line), snapshot["size"]["max"])
+
+    def test_disconnect(self):
+        client = backchannel.Client(self.printed.append)
+        responses = []
+        client.register_handler(
+            {"op": edn.Keyword("eval"), "code": "(Thread/sleep 60000)"},
+            responses.append,
+        )
+        client.disconnected()
+
+        self.assertEqual(1, len(responses))
+        self.assertTrue(responses[0][edn.Keyword("timeout")])
+        self.assertEqual(0, client.stats()["outstanding"])
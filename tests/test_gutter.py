@@ -0,0 +1,36 @@
+from unittest import TestCase
+
+import sublime
+
+from Tutkain.src.repl import gutter
+
+
+class TestMarks(TestCase):
+    def test_extend(self):
+        marks = gutter.Marks(3)
+        self.assertFalse(marks)
+        marks.extend([1, 2])
+        marks.extend([3, 4, 5, 6, 7])
+        self.assertEqual(3, len(marks))
+        self.assertEqual(
+            [sublime.Region(5, 5), sublime.Region(6, 6), sublime.Region(7, 7)],
+            marks.regions(),
+        )
+
+    def test_shift(self):
+        marks = gutter.Marks()
+        marks.extend([0, 10, 20, 30])
+        marks.shift(15)
+        self.assertEqual(
+            [sublime.Region(5, 5), sublime.Region(15, 15)], marks.regions()
+        )
+        marks.shift(5)
+        self.assertEqual(
+            [sublime.Region(0, 0), sublime.Region(10, 10)], marks.regions()
+        )
+
+    def test_clear(self):
+        marks = gutter.Marks()
+        marks.extend([1])
+        marks.clear()
+        self.assertEqual([], marks.regions())
@@ -0,0 +1,60 @@
+import time
+from unittest import TestCase
+
+from Tutkain.api import edn
+from Tutkain.src.repl import edn_client, heartbeat
+
+
+class Client:
+    def __init__(self):
+        self.printed = []
+        self.backchannel = edn_client.Client(self.printed.append)
+
+    def ops_client(self):
+        return self.backchannel
+
+
+class TestHeartbeat(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.changes = []
+        self.heartbeat = heartbeat.Heartbeat(self.client, 5, self.changes.append)
+
+    def test_rtt(self):
+        self.assertIsNone(self.heartbeat.describe())
+        self.heartbeat.pong(edn.kwmap({"op": edn.Keyword("echo")}), time.monotonic())
+        self.assertEqual(heartbeat.OK, self.heartbeat.status)
+        self.assertTrue(self.heartbeat.describe().endswith(" ms"))
+        self.assertEqual([self.heartbeat], self.changes)
+
+    def test_dead(self):
+        responses = []
+        evaluations = []
+        self.client.backchannel.register_handler(
+            {"op": edn.Keyword("lookup"), "named": "inc"},
+            responses.append,
+        )
+        self.client.backchannel.register_handler(
+            {"op": edn.Keyword("eval"), "code": "(Thread/sleep 60000)"},
+            evaluations.append,
+        )
+
+        timeout = edn.kwmap({"timeout": True})
+        self.heartbeat.pong(timeout, time.monotonic())
+        self.assertEqual("degraded", self.heartbeat.describe())
+        self.assertEqual([], responses)
+
+        self.heartbeat.pong(timeout, time.monotonic())
+        self.heartbeat.pong(timeout, time.monotonic())
+        self.assertEqual("not responding", self.heartbeat.describe())
+        self.assertEqual(1, len(responses))
+        self.assertTrue(responses[0][edn.Keyword("timeout")])
+
+        # Evaluations have no deadline, but fail too.
+        self.assertEqual(1, len(evaluations))
+        self.assertTrue(evaluations[0][edn.Keyword("timeout")])
+        self.assertEqual(0, self.client.backchannel.stats()["outstanding"])
+
+        # A response brings the connection back.
+        self.heartbeat.pong(edn.kwmap({"op": edn.Keyword("echo")}), time.monotonic())
+        self.assertEqual(heartbeat.OK, self.heartbeat.status)
@@ -0,0 +1,64 @@
+import json
+import logging
+import os
+import tempfile
+from unittest import TestCase
+
+from Tutkain.api import edn
+from Tutkain.src import log
+
+
+class TestTruncate(TestCase):
+    def test_truncate(self):
+        value = log.truncate(edn.kwmap({"val": "x" * 1000, "items": list(range(100))}))
+
+        self.assertTrue(value[":val"].startswith("x" * log.MAX_STRING_LENGTH))
+        self.assertTrue(value[":val"].endswith("(488 more characters)"))
+        self.assertEqual(log.MAX_ITEMS + 1, len(value[":items"]))
+        json.dumps(value)
+
+    def test_envelope(self):
+        envelope = edn.read_envelope('{:id 1 :val "' + "x" * 1000 + '"}')
+        self.assertEqual(
+            envelope.source[: log.MAX_STRING_LENGTH],
+            log.truncate(envelope)[: log.MAX_STRING_LENGTH],
+        )
+        self.assertIsNotNone(envelope.source)
+
+
+class TestLog(TestCase):
+    def test_buffer(self):
+        event_log = log.Log()
+        event_log.configure(logging.INFO, 2, logging.DEBUG)
+        event_log.debug("a", n=1)
+        event_log.debug("b", n=2)
+        event_log.info("c", error=ValueError("boom"))
+
+        self.assertEqual(["b", "c"], [event.name for event in event_log.events()])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "log.jsonl")
+            self.assertEqual(2, event_log.dump(path))
+
+            with open(path, encoding="utf-8") as file:
+                events = [json.loads(line) for line in file]
+
+        self.assertEqual("DEBUG", events[0]["level"])
+        self.assertEqual(2, events[0]["n"])
+        self.assertEqual("ValueError('boom')", events[1]["error"])
+
+    def test_buffer_level(self):
+        event_log = log.Log()
+        event_log.configure(logging.INFO, 2)
+        self.assertFalse(event_log.enabled(logging.DEBUG))
+        event_log.debug("a")
+        event_log.info("b")
+        self.assertEqual(["b"], [event.name for event in event_log.events()])
+
+    def test_disabled(self):
+        event_log = log.Log()
+        event_log.configure(logging.INFO, 0)
+        self.assertFalse(event_log.enabled(logging.DEBUG))
+        event_log.debug("a")
+        event_log.warning("b")
+        self.assertEqual([], event_log.events())
@@ -0,0 +1,42 @@
+from unittest import TestCase
+
+from Tutkain.api import edn
+from Tutkain.src.repl import lookups
+
+
+def response(ns):
+    return edn.kwmap({"info": edn.kwmap({"ns": ns})})
+
+
+class TestLookupCache(TestCase):
+    def test_lru(self):
+        cache = lookups.LookupCache(maxsize=2)
+        cache.put(("a", "clj", "user", "x"), response("user"))
+        cache.put(("a", "clj", "user", "y"), response("user"))
+        cache.get(("a", "clj", "user", "x"))
+        cache.put(("a", "clj", "user", "z"), response("user"))
+        self.assertIsNotNone(cache.get(("a", "clj", "user", "x")))
+        self.assertIsNone(cache.get(("a", "clj", "user", "y")))
+        self.assertEqual(2, len(cache))
+
+    def test_errors_are_not_cached(self):
+        cache = lookups.LookupCache()
+        key = ("a", "clj", "user", "x")
+        cache.put(key, edn.kwmap({"tag": edn.Keyword("err"), "val": "boom"}))
+        self.assertIsNone(cache.get(key))
+
+    def test_invalidate(self):
+        cache = lookups.LookupCache()
+        cache.put(("a", "clj", "my.app", "x"), response("my.app"))
+        cache.put(("a", "clj", "my.test", "y"), response("my.app"))
+        cache.put(("a", "clj", "my.test", "z"), response("clojure.core"))
+        cache.put(("b", "clj", "my.app", "x"), response("my.app"))
+
+        cache.invalidate("a", edn.Symbol("my.app"))
+        self.assertIsNone(cache.get(("a", "clj", "my.app", "x")))
+        self.assertIsNone(cache.get(("a", "clj", "my.test", "y")))
+        self.assertIsNotNone(cache.get(("a", "clj", "my.test", "z")))
+        self.assertIsNotNone(cache.get(("b", "clj", "my.app", "x")))
+
+        cache.invalidate("b")
+        self.assertIsNone(cache.get(("b", "clj", "my.app", "x")))
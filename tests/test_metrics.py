@@ -0,0 +1,45 @@
+from unittest import TestCase
+
+from Tutkain.api import edn
+from Tutkain.src.repl import metrics
+
+
+class TestHistogram(TestCase):
+    def test_percentile(self):
+        histogram = metrics.Histogram((1, 2, 5))
+        self.assertIsNone(histogram.percentile(50))
+
+        for value in [0.5] * 90 + [1.5] * 9 + [100]:
+            histogram.record(value)
+
+        self.assertEqual(1, histogram.percentile(50))
+        self.assertEqual(2, histogram.percentile(95))
+        self.assertEqual(2, histogram.percentile(99))
+        self.assertEqual(100, histogram.percentile(100))
+        self.assertEqual(100, histogram.count)
+        self.assertEqual(100, histogram.max)
+
+
+class TestMetrics(TestCase):
+    def test_snapshot(self):
+        m = metrics.Metrics()
+        lookup = edn.Keyword("lookup")
+        m.record_latency(lookup, 0.004)
+        m.record_size(lookup, 100)
+        m.record_timeout(edn.Keyword("eval"))
+
+        snapshot = m.snapshot()
+        self.assertEqual(0.004, snapshot[lookup]["latency"]["p99"])
+        self.assertEqual(100, snapshot[lookup]["size"]["p50"])
+        self.assertEqual(0, snapshot[lookup]["handling"]["count"])
+        self.assertEqual(1, snapshot[edn.Keyword("eval")]["timeouts"])
+
+        report = metrics.render(
+            "localhost:1234",
+            {"outstanding": 0, "peak": 1, "expired": 1},
+            snapshot,
+        )
+
+        self.assertIn(":lookup", report)
+        self.assertIn("4 ms", report)
+        self.assertIn("100 B", report)
@@ -0,0 +1,22 @@
+from unittest import TestCase
+
+from Tutkain.src.repl import printer
+from Tutkain.src.repl.keywords import ERR, OUT, RET, TAG, TAP, VAL
+
+
+class TestPrintQueue(TestCase):
+    def test_overflow(self):
+        q = printer.PrintQueue(2)
+        q.put({TAG: OUT, VAL: "1"})
+        q.put({TAG: ERR, VAL: "2"})
+        q.put({TAG: OUT, VAL: "3"})
+        q.put({TAG: TAP, VAL: "4"})
+        q.put({TAG: RET, VAL: "5"})
+        q.put(None)
+
+        self.assertEqual(2, q.take_suppressed())
+        self.assertEqual(0, q.take_suppressed())
+
+        batch = []
+        self.assertFalse(printer.drain(q, batch))
+        self.assertEqual(["1", "2", "5"], [item[VAL] for item in batch])
@@ -0,0 +1,60 @@
+from unittest import TestCase
+
+from Tutkain.api import edn
+from Tutkain.src.repl import edn_client
+from Tutkain.src.repl.reactor import MAX_URGENT_STREAK, Connection
+
+
+class TestConnection(TestCase):
+    def frames(self, connection):
+        frames = []
+
+        while (frame := connection.next_frame()) is not None:
+            frames.append(frame)
+
+        return frames
+
+    def test_priority(self):
+        connection = Connection(None, None, "test", None, None)
+        connection.write(b"bulk-1")
+        connection.write(b"bulk-2")
+        connection.write(b"urgent", urgent=True)
+        self.assertEqual([b"urgent", b"bulk-1", b"bulk-2"], self.frames(connection))
+
+    def test_starvation(self):
+        connection = Connection(None, None, "test", None, None)
+        connection.write(b"bulk")
+
+        for _ in range(MAX_URGENT_STREAK + 1):
+            connection.write(b"urgent", urgent=True)
+
+        frames = self.frames(connection)
+        self.assertEqual(b"bulk", frames[MAX_URGENT_STREAK])
+
+
+class TestFrames(TestCase):
+    def test_chunks(self):
+        message = edn.kwmap(
+            {
+                "op": edn.Keyword("load"),
+                "id": 1,
+                "code": "x" * (edn_client.CHUNK_SIZE * 2),
+            }
+        )
+
+        frames = [
+            edn.read(frame.decode("utf-8")) for frame in edn_client.frames(message)
+        ]
+        self.assertEqual(3, len(frames))
+        self.assertEqual(
+            [False, False, True], [frame[edn.Keyword("last?")] for frame in frames]
+        )
+
+        self.assertEqual(
+            message,
+            edn.read("".join(frame[edn.Keyword("data")] for frame in frames)),
+        )
+
+    def test_small(self):
+        message = edn.kwmap({"op": edn.Keyword("echo"), "id": 1})
+        self.assertEqual([b"{:op :echo :id 1}\n"], edn_client.frames(message))
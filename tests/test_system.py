@@ -1,4 +1,5 @@
 import sys
+import time
 from concurrent import futures
 
 import sublime
@@ -76,7 +77,16 @@ class TestConnectDisconnect(TestCase):
 
         default_args = {"host": server.host, "port": server.port, "mode": "repl"}
         window.run_command("tutkain_connect", {**default_args, **args})
-        return server.connection.result(timeout=3)
+        server = server.connection.result(timeout=3)
+
+        # Tutkain connects in the background.
+        deadline = time.monotonic() + 3
+
+        while not state.get_active_connection(window, edn.Keyword(dialect)):
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+
+        return server
 
     def disconnect(self, window):
         window.run_command("tutkain_disconnect")
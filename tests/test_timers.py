@@ -0,0 +1,29 @@
+from unittest import TestCase
+
+from Tutkain.src.repl.timers import TimerWheel
+
+
+class TestTimerWheel(TestCase):
+    def test_advance(self):
+        wheel = TimerWheel(tick=1, slots=4)
+        self.assertIsNone(wheel.timeout())
+
+        wheel.schedule(2.5, "a")
+        wheel.schedule(10, "b")
+        start = wheel.ticked
+        self.assertEqual(2, len(wheel))
+
+        self.assertEqual([], wheel.advance(start + 2.9))
+        self.assertEqual(["a"], wheel.advance(start + 3))
+        self.assertEqual([], wheel.advance(start + 9.5))
+        self.assertEqual(["b"], wheel.advance(start + 10))
+        self.assertEqual(0, len(wheel))
+
+    def test_cancel(self):
+        wheel = TimerWheel(tick=1, slots=4)
+        timer = wheel.schedule(1, "a")
+        start = wheel.ticked
+        timer.cancel()
+        timer.cancel()
+        self.assertEqual(0, len(wheel))
+        self.assertEqual([], wheel.advance(start + 5))
@@ -102,6 +102,9 @@ class PackageTestCase(DeferrableTestCase):
     @classmethod
     def setUpClass(self):
         self.executor = futures.ThreadPoolExecutor()
+        # Heartbeats would interleave :echo ops with the ops tests expect.
+        self.heartbeat_interval = settings.load().get("heartbeat_interval")
+        settings.load().set("heartbeat_interval", 0)
         sublime.run_command("new_window")
         self.window = sublime.active_window()
 
@@ -110,6 +113,11 @@ class PackageTestCase(DeferrableTestCase):
         if self.window:
             self.window.run_command("close_window")
 
+        if self.heartbeat_interval is None:
+            settings.load().erase("heartbeat_interval")
+        else:
+            settings.load().set("heartbeat_interval", self.heartbeat_interval)
+
         self.executor.shutdown(wait=False)
 
     def setUp(self, syntax="Packages/Tutkain/Clojure (Tutkain).sublime-syntax"):